@@ -0,0 +1,4 @@
+"""各条件实验脚本共用的基础模块 (字体、文本排版、计时、日志等)"""
+
+# 程序版本：改动实验流程、文案或参数时递增，汇总数据库的 script_version 列据此区分数据来自哪一版
+__version__ = "2.0"
@@ -0,0 +1,251 @@
+"""
+场景渲染基准：在屏幕外 (SDL dummy 视频驱动) 逐帧运行场景函数，统计帧耗时的 p50/p95/p99
+和 Python 层的内存分配，可保存为基线并与之比较，用来客观验证渲染优化的效果。
+
+    python -m exp_core.bench -n 300 --size 1280x800 --size 1920x1080 --save bench_baseline.json
+    python -m exp_core.bench -n 300 --size 1280x800 --size 1920x1080 --baseline bench_baseline.json
+
+帧耗时不含帧率限制的等待 (clock.tick 不休眠，TIME_SCALE 为 0)；静态场景每次都清空缓存，
+测的是首次显示时的完整绘制。场景记录的事件每帧之后丢弃 (基准不打开日志，否则会一直堆积)。
+内存分配用 tracemalloc 单独跑一遍统计，只包括 Python 对象，不包括 SDL 分配的像素缓冲。
+基线与机器有关，只在同一台机器上比较。
+"""
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import contextlib
+import io
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+
+import pygame
+
+from exp_core import engine, fonts
+from exp_core.conditions import CONDITIONS, get_condition
+from exp_core.event_log import reset_event_log
+from exp_core.render import clear_static_layers
+from exp_core.text_layout import draw_text_wrapped, clear_layout_cache
+
+# p50 超过基线的比例大于该值视为变慢
+DEFAULT_TOLERANCE = 0.15
+
+
+class _BenchClock:
+    """代替 engine.clock：不限帧率，记录每帧耗时，并在每帧结束时回调 on_frame(帧序号)"""
+
+    def __init__(self, on_frame):
+        self.on_frame = on_frame
+        self.frame_ns = []
+        self._last = time.perf_counter_ns()
+
+    def tick(self, framerate=0):
+        now = time.perf_counter_ns()
+        self.frame_ns.append(now - self._last)
+        self.on_frame(len(self.frame_ns))
+        reset_event_log()  # 日志没有打开，场景记录的事件只会堆在缓冲区里
+        self._last = time.perf_counter_ns()  # 回调投递按键的时间不计入下一帧
+        return 0
+
+
+def _post_keys(*names):
+    for name in names:
+        unicode = {"return": "\r", "space": " "}.get(name, name if len(name) == 1 else "")
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.key.key_code(name), unicode=unicode,
+                                             mod=0, scancode=0))
+
+
+def _typing_scene(scene, digit):
+    """输入框场景：每帧交替输入/删除一个字符 (每帧都要重绘输入框)，满 N 帧后确认退出"""
+    def run(frames):
+        total = frames + 1  # 第一帧包含场景的静态绘制，不计入
+
+        def on_frame(n):
+            if n == total:
+                _post_keys("backspace", digit, "return")  # 输入框里至多一个字符，清空后确认
+            elif n < total:
+                _post_keys(digit if n % 2 else "backspace")
+
+        pygame.event.clear()
+        engine.clock = _BenchClock(on_frame)
+        with contextlib.redirect_stdout(io.StringIO()):
+            scene()
+        return engine.clock.frame_ns[1:total]
+    return run
+
+
+def _loading_results(frames):
+    """进度条场景：每帧推进一次进度，反复运行直到满 N 帧 (动画时长缩短为 1/50)"""
+    engine.TIME_SCALE = 0.02
+    frame_ns = []
+    try:
+        while len(frame_ns) < frames:
+            engine.clock = _BenchClock(lambda n: None)
+            engine.scene_loading_results("bench")
+            frame_ns.extend(engine.clock.frame_ns[1:])  # 第一帧包含场景的静态绘制，不计入
+    finally:
+        engine.TIME_SCALE = 0
+    return frame_ns[:frames]
+
+
+def _static_scene(scene):
+    """阅读类场景：清空缓存后完整显示一次算一帧"""
+    def run(frames):
+        frame_ns = []
+        pygame.event.clear()
+        for _ in range(frames):
+            clear_static_layers()
+            clear_layout_cache()
+            _post_keys("space")
+            start = time.perf_counter_ns()
+            scene()
+            frame_ns.append(time.perf_counter_ns() - start)
+            reset_event_log()
+        return frame_ns
+    return run
+
+
+def _text_wrapped(cached):
+    """反馈报告正文的 draw_text_wrapped (cached=False 时每帧清空排版缓存)"""
+    def run(frames):
+        rect = pygame.Rect(int(engine.SCREEN_WIDTH * 0.2), int(engine.SCREEN_HEIGHT * 0.2),
+                           int(engine.SCREEN_WIDTH * 0.6), int(engine.SCREEN_HEIGHT * 0.6))
+        surface = pygame.Surface((engine.SCREEN_WIDTH, engine.SCREEN_HEIGHT))
+        font = engine.get_font(30)
+        frame_ns = []
+        for _ in range(frames):
+            if not cached:
+                clear_layout_cache()
+            start = time.perf_counter_ns()
+            surface.fill(engine.BG_COLOR)
+            draw_text_wrapped(surface, engine._texts["feedback"], engine.TEXT_COLOR, rect, font)
+            frame_ns.append(time.perf_counter_ns() - start)
+        return frame_ns
+    return run
+
+
+# 基准项 -> run(帧数) 返回每帧耗时 (ns)
+CASES = {
+    "feedback_text": _text_wrapped(cached=False),
+    "feedback_text_cached": _text_wrapped(cached=True),
+    "id_input": _typing_scene(lambda: engine.get_user_input("请输入被试编号 (ID):"), "1"),
+    "pgg_game": _typing_scene(lambda: engine.scene_pgg_game_visual(), "5"),
+    "loading_results": _loading_results,
+    "feedback_scene": _static_scene(lambda: engine.scene_feedback()),
+    "pgg_instruction": _static_scene(lambda: engine.scene_pgg_instruction()),
+    "necessity": _static_scene(lambda: engine.scene_necessity_manipulation(engine.COND["necessity"])),
+}
+
+
+def setup(condition_name, size, font_scale):
+    """按给定分辨率和字号倍率初始化屏幕外窗口和条件"""
+    engine.SCREEN_WIDTH, engine.SCREEN_HEIGHT = size
+    engine.TIME_SCALE = 0
+    engine.get_font = lambda size, family=None: fonts.get_font(max(1, round(size * font_scale)), family)
+    engine.COND = get_condition(condition_name)
+    engine.load_texts(engine.COND)
+    engine.init_display(engine.COND["caption"])
+
+
+def _percentile(sorted_ms, p):
+    index = min(len(sorted_ms) - 1, max(0, round(p / 100 * len(sorted_ms)) - 1))
+    return sorted_ms[index]
+
+
+def measure(case, frames):
+    """运行一个基准项：先计时，再在 tracemalloc 下跑一遍统计内存分配"""
+    run = CASES[case]
+    run(min(frames, 10))  # 预热 (字体、代码路径)
+    frame_ms = sorted(ns / 1e6 for ns in run(frames))
+
+    tracemalloc.start()
+    start_bytes = tracemalloc.get_traced_memory()[0]
+    run(frames)
+    reset_event_log()  # 最后一帧之后的记录不算作泄漏
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "frames": len(frame_ms),
+        "mean_ms": round(statistics.fmean(frame_ms), 4),
+        "p50_ms": round(_percentile(frame_ms, 50), 4),
+        "p95_ms": round(_percentile(frame_ms, 95), 4),
+        "p99_ms": round(_percentile(frame_ms, 99), 4),
+        "alloc_peak_kib": round((peak - start_bytes) / 1024, 1),
+        "alloc_retained_kib": round((current - start_bytes) / 1024, 1),
+    }
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """与基线比较 p50，返回变慢的项 [(项, 基线 p50, 当前 p50)]"""
+    slower = []
+    for key, row in results.items():
+        base = baseline.get(key)
+        if base and row["p50_ms"] > base["p50_ms"] * (1 + tolerance):
+            slower.append((key, base["p50_ms"], row["p50_ms"]))
+    return slower
+
+
+def _size(text):
+    width, _, height = text.lower().partition("x")
+    return int(width), int(height)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="场景渲染基准")
+    parser.add_argument("cases", nargs="*", help=f"基准项 (默认全部): {', '.join(CASES)}")
+    parser.add_argument("-n", "--frames", type=int, default=200, help="每项的帧数")
+    parser.add_argument("--size", type=_size, action="append", help="分辨率，如 1280x800，可重复")
+    parser.add_argument("--font-scale", type=float, action="append", help="字号倍率，如 1.25，可重复")
+    parser.add_argument("--condition", default="Exc_Ext_High", help="取文案和参数的条件")
+    parser.add_argument("--save", help="把结果保存为 JSON (可作为基线)")
+    parser.add_argument("--baseline", help="与该 JSON 基线比较")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="p50 允许变慢的比例")
+    args = parser.parse_args(argv)
+    cases = args.cases or list(CASES)
+    unknown = [case for case in cases if case not in CASES]
+    if unknown:
+        parser.error(f"未知基准项: {', '.join(unknown)}")
+    if args.condition not in CONDITIONS:
+        parser.error(f"未知条件: {args.condition}")
+
+    results = {}
+    print(f"{'case':40} {'p50':>8} {'p95':>8} {'p99':>8} {'peak KiB':>9} {'kept KiB':>9}")
+    for size in args.size or [(engine.SCREEN_WIDTH, engine.SCREEN_HEIGHT)]:
+        for font_scale in args.font_scale or [1.0]:
+            setup(args.condition, size, font_scale)
+            for case in cases:
+                key = f"{case}@{size[0]}x{size[1]}/font{font_scale:g}"
+                row = results[key] = measure(case, args.frames)
+                print(f"{key:40} {row['p50_ms']:8.3f} {row['p95_ms']:8.3f} {row['p99_ms']:8.3f} "
+                      f"{row['alloc_peak_kib']:9.1f} {row['alloc_retained_kib']:9.1f}")
+    pygame.quit()
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f">>> 结果已保存: {args.save}")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        for key, row in results.items():
+            if key in baseline:
+                base = baseline[key]
+                print(f"{key:40} p50 {base['p50_ms']:.3f} -> {row['p50_ms']:.3f} ms "
+                      f"({row['p50_ms'] / base['p50_ms'] - 1:+.0%}), "
+                      f"p95 {base['p95_ms']:.3f} -> {row['p95_ms']:.3f} ms")
+        slower = compare(results, baseline, args.tolerance)
+        for key, base_ms, ms in slower:
+            print(f"【变慢】{key}: p50 {base_ms:.3f} -> {ms:.3f} ms")
+        return 1 if slower else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+"""
+条件表：Cyberball (排斥/接纳) × 归因 (内部/外部) × 必要性 (高/低) 的每个单元格
+用到的场景顺序、文案编号和参数。姿势 (防御/中性) 由被试编号奇偶决定，不单列条件。
+
+新增条件只需在 CONDITIONS 中加一项，引擎 (engine.py) 不用改。
+"""
+
+# 各条件共用的默认参数，条件项中的同名字段会覆盖这里
+DEFAULTS = {
+    "pgg_endowment": 10,
+    "pgg_multiplier": 2,
+    "pgg_threshold": None,
+    "warning_color": (255, 100, 100),  # 红色提示 (输入错误)
+    "log_filename": "key_logs_{subject_id}.csv",
+    "log_subject_column": False,  # 日志中是否带 Subject_ID 列
+    "cyberball_script": None,  # 与 Cyberball 程序同目录的 .cbs 脚本
+    "pgg_note": "Start Game",
+}
+
+# 各条件共用的文案 (场景中的文案角色 -> texts.py 中的文案编号)
+DEFAULT_TEXTS = {
+    "posture_defensive": "posture_defensive",
+    "posture_neutral": "posture_neutral",
+    "pgg_instruction": "pgg_instruction",
+    "pgg_hint": "pgg_hint_start",
+}
+
+# 外部 Cyberball 运行时关闭 Pygame 窗口，结束后重建 (阶段一 / 阶段二)
+SCENES_BLOCKING = [
+    "posture_instruction", "cyberball_instruction", "matching", "ready_to_launch", "cyberball_blocking",
+    "loading_results", "feedback", "call_experimenter", "pgg_instruction", "pgg_game",
+]
+SCENES_BLOCKING_NECESSITY = SCENES_BLOCKING[:-1] + ["necessity", "pgg_game"]
+# 不关闭窗口，在提示画面下直接启动 Cyberball
+SCENES_INLINE = [
+    "posture_instruction", "cyberball_instruction", "matching", "cyberball_inline",
+    "loading_results", "feedback", "call_experimenter", "pgg_instruction", "pgg_game",
+]
+
+CONDITIONS = {
+    "Exc_Ext_High": {
+        "cyberball": "exclusion",
+        "cyberball_condition": "1",  # 固定为排斥
+        "attribution": "external",
+        "necessity": "high",
+        "caption": "Social Interaction Experiment (High Necessity)",
+        "condition_record": "Cyber{cyberball_condition}_Ext_{posture}_{necessity}",
+        "scenes": SCENES_BLOCKING_NECESSITY,
+        "pgg_threshold": 15,  # 【高必要性】门槛：三人总投需达15
+        "warning_color": (255, 50, 50),  # 红色警示 (用于高必要性)
+        "log_filename": "reaction_times_{subject_id}.csv",
+        "log_subject_column": True,
+        "cyberball_script": "Standard.cbs",
+        "pgg_note": "Read Rules",
+        "texts": {
+            "pgg_hint": "pgg_hint_continue",
+            "cyberball_instruction": "cyberball_instruction",
+            "matching": "matching_short",
+            "ready": "ready_exc_ext_high",
+            "feedback": "feedback_exc_ext",
+            "necessity": "necessity_high",
+        },
+    },
+    "Exc_Ext_Low": {
+        "cyberball": "exclusion",
+        "cyberball_condition": "1",
+        "attribution": "external",
+        "necessity": "low",
+        "caption": "Social Interaction Experiment (External Attribution)",
+        "condition_record": "Cyber{cyberball_condition}_External_{posture}",
+        "scenes": SCENES_BLOCKING,
+        "cyberball_script": "Standard.cbs",
+        "texts": {
+            "posture_neutral": "posture_neutral_short",
+            "cyberball_instruction": "cyberball_instruction_retry",
+            "matching": "matching_long",
+            "ready": "ready_exc_ext_low",
+            "feedback": "feedback_exc_ext",
+        },
+    },
+    "Exc_Int_High": {
+        "cyberball": "exclusion",
+        "cyberball_condition": "1",
+        "attribution": "internal",
+        "necessity": "high",
+        "caption": "Social Interaction Experiment (Exclusion + Internal + High Necessity)",
+        "condition_record": "Cyber{cyberball_condition}_Int_{posture}_{necessity}",
+        "scenes": SCENES_BLOCKING_NECESSITY,
+        "pgg_threshold": 15,
+        "warning_color": (255, 50, 50),
+        "log_filename": "reaction_times_{subject_id}.csv",
+        "log_subject_column": True,
+        "cyberball_script": "Standard.cbs",
+        "pgg_note": "Read Rules",
+        "texts": {
+            "pgg_hint": "pgg_hint_continue",
+            "cyberball_instruction": "cyberball_instruction",
+            "matching": "matching_short",
+            "ready": "ready_exc_int_high",
+            "feedback": "feedback_exc_int",
+            "necessity": "necessity_high",
+        },
+    },
+    "Exc_Int_Low": {
+        "cyberball": "exclusion",
+        "cyberball_condition": "1",
+        "attribution": "internal",
+        "necessity": "low",
+        "caption": "Social Interaction Experiment",
+        "condition_record": "Cyber{cyberball_condition}_{posture}",
+        "scenes": SCENES_INLINE,
+        "texts": {
+            "cyberball_instruction": "cyberball_instruction_retry_thankyou",
+            "matching": "matching_long",
+            "ready": "call_cyberball_inline",
+            "feedback": "feedback_exc_int_plain",
+        },
+    },
+    "Inc_Ext_Low": {
+        "cyberball": "inclusion",
+        "cyberball_condition": "2",  # 不排斥/接纳
+        "attribution": "external",
+        "necessity": "low",
+        "caption": "Social Interaction Experiment (Inclusion + External + Low Necessity)",
+        "condition_record": "Cyber{cyberball_condition}_Ext_{posture}_{necessity}",
+        "scenes": SCENES_BLOCKING_NECESSITY,
+        "log_filename": "reaction_times_{subject_id}.csv",
+        "log_subject_column": True,
+        "cyberball_script": "Standard.cbs",
+        "pgg_note": "Read Rules",
+        "texts": {
+            "pgg_hint": "pgg_hint_continue",
+            "cyberball_instruction": "cyberball_instruction",
+            "matching": "matching_short",
+            "ready": "ready_inc_ext_low",
+            "feedback": "feedback_inc_ext",
+            "necessity": "necessity_low",
+        },
+    },
+    "Inc_Int_Low": {
+        "cyberball": "inclusion",
+        "cyberball_condition": "2",  # Cyberball 配置中 Condition 2 是接纳
+        "attribution": "internal",
+        "necessity": "low",
+        "caption": "Social Interaction Experiment (Inclusion Condition)",
+        "condition_record": "Cyber{cyberball_condition}_{posture}",
+        "scenes": SCENES_INLINE,
+        "texts": {
+            "cyberball_instruction": "cyberball_instruction_retry_thankyou_continue",
+            "matching": "matching_long",
+            "ready": "call_cyberball_inline",
+            "feedback": "feedback_inc_int",
+        },
+    },
+}
+
+
+def get_condition(name):
+    """取出条件项并补全默认参数；未知条件抛出 KeyError 并列出可选条件"""
+    if name not in CONDITIONS:
+        raise KeyError(f"未知条件 {name!r}，可选: {', '.join(CONDITIONS)}")
+    condition = {**DEFAULTS, "name": name, **CONDITIONS[name]}
+    condition["texts"] = {**DEFAULT_TEXTS, **condition["texts"]}
+    return condition
+
+
+# 姿势按被试编号奇偶分配 (奇数 defensive)
+POSTURES = ("defensive", "neutral")
+
+
+def condition_record(condition, posture):
+    """汇总表 Condition_Group 列的字符串 (各条件的格式沿用原脚本)"""
+    return condition["condition_record"].format(cyberball_condition=condition["cyberball_condition"],
+                                                posture=posture, necessity=condition["necessity"])
+
+
+def condition_factors(condition, posture):
+    """汇总数据库中按列保存的条件因素 (列名见 summary_store.FACTOR_COLUMNS)"""
+    return {
+        "condition": condition["name"],
+        "cyberball": condition["cyberball"],
+        "attribution": condition["attribution"],
+        "posture": posture,
+        "necessity": condition["necessity"],
+        "pgg_threshold": condition["pgg_threshold"],
+        "pgg_multiplier": condition["pgg_multiplier"],
+    }
+
+
+def parse_condition_record(record):
+    """Condition_Group 字符串 -> (条件名, 姿势)；无法识别时返回 (None, None)"""
+    for name in CONDITIONS:
+        condition = get_condition(name)
+        for posture in POSTURES:
+            if condition_record(condition, posture) == record:
+                return name, posture
+    return None, None
+
+
+def log_filename_templates():
+    """各条件用到的日志文件名模板"""
+    return sorted({get_condition(name)["log_filename"] for name in CONDITIONS})
@@ -0,0 +1,33 @@
+"""
+内置 Cyberball 的传球规则 (与绘制无关，场景见 engine.scene_cyberball_game)。
+
+三名玩家：Player A、Player B (程序控制) 和被试 (You)。
+程序玩家拿到球后等待一段随机时长再传出，传给谁由条件决定：
+- 接纳 (inclusion)：等概率传给另外两人，被试约获得 1/3 的传球；
+- 排斥 (exclusion)：开始阶段传给被试 EXCLUSION_RECEIVES 次，之后只在两名程序玩家之间传。
+随机数由种子决定，同一种子 + 同样的被试选择可完全复现整局。
+"""
+PLAYERS = ("Player A", "Player B", "You")
+YOU = 2
+
+# 整局传球次数 (含被试的传球)
+THROWS = 30
+# 排斥条件下被试在开始阶段接到球的次数
+EXCLUSION_RECEIVES = 2
+# 程序玩家拿球后的等待时长 (毫秒)
+NPC_DELAY_MS = (500, 2500)
+# 球的飞行时长 (毫秒)
+FLIGHT_MS = 800
+
+
+def npc_target(rng, holder, cyberball, received):
+    """程序玩家 holder 传球的目标；received 为被试已接到球的次数"""
+    other_npc = 1 - holder
+    if cyberball == "exclusion":
+        return YOU if received < EXCLUSION_RECEIVES else other_npc
+    return YOU if rng.random() < 0.5 else other_npc
+
+
+def npc_delay_ms(rng):
+    """程序玩家拿球后的等待时长"""
+    return rng.uniform(*NPC_DELAY_MS)
@@ -0,0 +1,1143 @@
+"""
+实验引擎：按条件表 (conditions.py) 运行 Cyberball × 归因 × 必要性设计中的任一单元格。
+
+场景顺序、文案和参数都来自条件表，六个条件脚本只是调用 run(条件名) 的入口。
+也可以直接运行任一条件:  python -m exp_core.engine Exc_Ext_High
+"""
+from exp_core import startup
+
+import pygame
+import sys
+import math
+import time
+import random
+import os
+import datetime
+import traceback
+import importlib.util
+import socket
+import uuid
+
+startup.mark("import pygame")
+
+from exp_core import __version__, cyberball, profiling
+from exp_core.conditions import (CONDITIONS, get_condition, condition_record, condition_factors,
+                                 log_filename_templates)
+from exp_core.texts import TEXTS
+from exp_core.fonts import cache_dir, get_font, preload_fonts, clear_font_cache, font_cache_stats
+from exp_core.text_layout import draw_text_wrapped, clear_layout_cache, layout_cache_stats
+from exp_core.render import show_static_scene, present_layer, restore_rects, update_rects, clear_static_layers
+from exp_core.events import wait_for_key, REDRAW_EVENTS
+from exp_core.summary_store import append_csv, commit_session, register_session, session_file_id
+from exp_core.event_log import open_event_log, log_event, checkpoint_event_log, close_event_log
+from exp_core.window import hide_window, restore_window
+from exp_core.timeline import timeline, locate, tween
+from exp_core import events
+from exp_core.timing import now_ns, last_flip_ns, elapsed_ms, begin_scene, flip_display, write_timing_summary, \
+    reset_timing, set_vsync, pace_frame
+
+startup.mark("import exp_core")
+
+# ================= 配置区域 =================
+
+# 【A. 核心路径】请修改为您电脑上 Cyberball 可执行文件的实际路径
+CYBERBALL_PATH = r"D:\Program\Cyberball\Cyberball-Play.exe"
+
+# 【B. 脚本文件】在条件表的 cyberball_script 中指定 (如 Standard.cbs)，
+# 该文件必须与 Cyberball-Play.exe 在同一个文件夹里
+
+# 【C. Cyberball 版本】"external": 外部 Cyberball 程序；"native": 在实验窗口内运行内置版；
+# "auto": Windows 上使用外部程序 (路径错误时照常报错，不会悄悄换成内置版)，
+# 其他平台上找不到外部程序时使用内置版并给出提示。实际使用的版本记入汇总数据
+CYBERBALL_MODE = "auto"
+
+# 外部 Cyberball 启动后轮询其窗口出现 (标题包含该字符串，且属于本次启动的进程)，就绪后再自动填写 ID/Condition；
+# 最多等待 CYBERBALL_READY_TIMEOUT 秒，超时则不自动填写 (避免键入到其他窗口)。
+# 无法查询窗口的平台上退回到固定等待 CYBERBALL_READY_FALLBACK 秒
+CYBERBALL_WINDOW_TITLE = "Cyberball"
+CYBERBALL_READY_TIMEOUT = 15
+CYBERBALL_READY_FALLBACK = 3
+
+# 若 Cyberball 支持通过命令行接收 ID/Condition，在此填写参数模板，设置后不再模拟键入，
+# 例如 ["--participant", "{subject_id}", "--condition", "{condition_id}"]
+CYBERBALL_ID_ARGS = None
+
+# 外部 Cyberball 运行期间只隐藏实验窗口，结束后恢复 (字体、预渲染画面保持有效)；
+# False 为旧流程：关闭 Pygame，结束后重新初始化
+CYBERBALL_KEEP_WINDOW = True
+
+# 封面动画 (匹配、分析进度) 和场景中固定等待的时长倍率；无界面批量运行 (exp_core/headless.py) 时为 0
+TIME_SCALE = 1.0
+
+# 使用内置版时，条件表中启动外部程序的场景换成内置场景
+EXTERNAL_CYBERBALL_SCENES = ("ready_to_launch", "cyberball_blocking", "cyberball_inline")
+
+# 结果数据文件名 (汇总数据)
+DATA_FILENAME = "experiment_data.csv"
+
+# 汇总数据库 (SQLite，Subject_ID 建索引)：每个会话的汇总在同一个写事务内存入数据库并追加到
+# DATA_FILENAME，多台电脑写同一个目录时不会交错或重复。
+# 数据在网络共享目录时必须用 "DELETE"；只有本机磁盘才能用 "WAL"
+SUMMARY_DB_FILENAME = "experiment_data.sqlite"
+SUMMARY_JOURNAL_MODE = "DELETE"
+
+# 输入的被试编号已有会话时："version": 照常进行，数据文件加 _v2、_v3 ... 后缀 (不覆盖旧文件)；
+# "block": 提示编号已被使用，要求重新输入
+DUPLICATE_ID_POLICY = "version"
+
+# 【D. 显示同步】True 时以 SCALED + vsync=1 打开窗口，画面提交与显示器刷新同步
+# (驱动不支持时退回普通窗口并提示)
+DISPLAY_VSYNC = False
+
+# 各类场景的目标帧率 (Hz)。input: 输入框 (按键在出队时打时间戳，帧率决定其精度)；
+# animation: Cyberball 和封面动画；reading: 阅读类场景阻塞等待按键，只按该频率醒来处理信号
+FRAME_RATES = {"input": 60, "animation": 60, "reading": 10}
+
+# 窗口大小
+SCREEN_WIDTH = 1280
+SCREEN_HEIGHT = 800
+
+# 颜色定义
+BG_COLOR = (20, 20, 20)
+TEXT_COLOR = (255, 255, 255)
+BAR_COLOR = (0, 200, 100)
+HIGHLIGHT_COLOR = (255, 215, 0)  # 金色
+NPC_COLOR = (100, 100, 100)  # 灰色
+
+# 必要性操纵场景的样式
+NECESSITY_STYLES = {
+    # 【高必要性】红色警示，生存模式
+    "high": {"title": "⚠️ 高风险模式 ⚠️", "border": (255, 50, 50), "box": (30, 0, 0), "note": "Condition: High"},
+    # 【低必要性】绿色安全色，常规模式
+    "low": {"title": "常规模式", "border": (100, 255, 100), "box": (30, 30, 30), "note": "Condition: Low"},
+}
+
+# 日志列 (不含 Subject_ID)
+LOG_FIELDNAMES = ["Scene", "Timestamp", "Reaction_Time_ms", "Key", "Note", "Onset_ns", "Event_ns"]
+
+# 各场景用到的字号，启动时只预加载当前条件的场景需要的字号
+SCENE_FONTS = {
+    "id_input": (24, 32, 36),
+    "posture_instruction": (24, 32, 40),
+    "cyberball_instruction": (24, 30),
+    "matching": (28, 40),
+    "ready_to_launch": (24, 32),
+    "cyberball_inline": (24, 30, 32),
+    "cyberball_blocking": (),
+    "cyberball_native": (24, 32),
+    "loading_results": (24, 40),
+    "feedback": (24, 30),
+    "call_experimenter": (32, 40, 70),
+    "pgg_instruction": (24, 32),
+    "necessity": (24, 32, 50),
+    "pgg_game": (24, 32, 36),
+    "end": (40,),
+}
+
+# ===========================================
+
+screen = None
+clock = None
+COND = None  # 当前条件 (get_condition 的结果)
+_texts = {}  # 当前条件用到的文案 (角色 -> 已填充条件参数的文案)
+
+
+class _KeepMissing(dict):
+    """format_map 用：条件参数之外的占位符 (如 {subject_id}) 原样保留，留给场景填充"""
+
+    def __missing__(self, key):
+        return "{" + key + "}"
+
+
+def load_texts(condition):
+    """只取出当前条件引用的文案，并填充 PGG 参数"""
+    params = _KeepMissing(endowment=condition["pgg_endowment"], multiplier=condition["pgg_multiplier"],
+                          threshold=condition["pgg_threshold"])
+    _texts.clear()
+    for role, text_id in condition["texts"].items():
+        text = TEXTS[text_id]
+        _texts[role] = text.format_map(params) if isinstance(text, str) else text
+
+
+def resolve_cyberball_mode():
+    """按 CYBERBALL_MODE 确定本次会话使用的 Cyberball 版本 ("external" 或 "native")"""
+    if CYBERBALL_MODE != "auto":
+        return CYBERBALL_MODE
+    if sys.platform.startswith("win") or os.path.exists(CYBERBALL_PATH):
+        return "external"
+    print(f"【注意】找不到 Cyberball 程序 ({CYBERBALL_PATH})，本次使用内置 Cyberball (汇总数据中记为 native)")
+    return "native"
+
+
+def resolve_scenes(condition, mode):
+    """按 Cyberball 版本确定实际运行的场景顺序"""
+    if mode == "external":
+        return list(condition["scenes"])
+    scenes = []
+    for scene_id in condition["scenes"]:
+        if scene_id in EXTERNAL_CYBERBALL_SCENES:
+            scene_id = "cyberball_native"
+        if scene_id not in scenes:
+            scenes.append(scene_id)
+    return scenes
+
+
+def condition_font_sizes(condition):
+    """当前条件的全部场景用到的字号"""
+    sizes = set(SCENE_FONTS["id_input"]) | set(SCENE_FONTS["end"])
+    for scene_id in condition["scenes"]:
+        sizes.update(SCENE_FONTS[scene_id])
+    return sorted(sizes)
+
+
+def init_display(caption):
+    """(重新) 创建窗口、时钟并预加载字体"""
+    global screen, clock
+    os.environ['SDL_VIDEO_CENTERED'] = '1'
+    pygame.init()
+    startup.mark("pygame.init")
+    screen = set_display_mode()
+    pygame.display.set_caption(caption)
+    clock = pygame.time.Clock()
+    events.WAIT_TIMEOUT_MS = round(1000 / FRAME_RATES["reading"])
+    startup.mark("set_mode")
+    clear_font_cache()
+    clear_layout_cache()
+    clear_static_layers()
+    preload_fonts(condition_font_sizes(COND))
+    startup.mark("preload_fonts")
+
+
+def display_mode_flags():
+    """set_mode 的 (flags, vsync) 参数"""
+    return (pygame.SCALED, 1) if DISPLAY_VSYNC else (0, 0)
+
+
+def set_display_mode():
+    """按 DISPLAY_VSYNC 打开窗口；垂直同步不可用时退回普通窗口"""
+    flags, vsync = display_mode_flags()
+    try:
+        surface = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), flags, vsync=vsync)
+    except pygame.error as e:
+        print(f"【提示】无法开启垂直同步 ({e})，使用普通窗口")
+        surface = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        vsync = 0
+    if vsync and hasattr(pygame.display, "is_vsync") and not pygame.display.is_vsync():
+        print("【提示】显示驱动未开启垂直同步，按目标帧率定速")
+        vsync = 0
+    set_vsync(bool(vsync))
+    return surface
+
+
+def pause(seconds):
+    """场景中的固定等待，时长乘以 TIME_SCALE"""
+    if TIME_SCALE > 0:
+        time.sleep(seconds * TIME_SCALE)
+
+
+def load_pyautogui():
+    """走外部 Cyberball 流程时才导入 pyautogui (它会连带加载截图等依赖，拖慢启动)"""
+    try:
+        import pyautogui
+    except ImportError:
+        print("【错误】缺少 pyautogui 库，无法自动填写 ID。请运行: pip install pyautogui")
+        return None
+    return pyautogui
+
+
+def record_event(scene_name, event_key, reaction_time_ms, note="", onset_ns=None, event_ns=None):
+    """记录按键事件 (紧凑存储，写出日志时再格式化)"""
+    log_event(scene_name, event_key, reaction_time_ms, note, onset_ns, event_ns)
+
+
+def unused_file_version(subject_id):
+    """登记表不可用时按已有的数据文件确定版本号，不覆盖该编号之前的日志"""
+    version = 1
+    while any(os.path.exists(template.format(subject_id=session_file_id(subject_id, version)))
+              for template in log_filename_templates() + ["timing_quality_{subject_id}.csv"]):
+        version += 1
+    if version > 1:
+        print(f"【警告】编号 {subject_id} 已有数据文件，本次数据文件加后缀 _v{version}")
+    return version
+
+
+def save_summary_fallback(row, error):
+    """汇总数据库不可用时：直接追加汇总表；汇总表也写不了时暂存到本机缓存目录"""
+    print(f"【警告】汇总数据库不可用 ({error})")
+    try:
+        append_csv(DATA_FILENAME, row)
+        print(f"【警告】汇总数据已直接追加到 {DATA_FILENAME}，未写入数据库。\n"
+              f"        数据库恢复后请运行: python -m exp_core.summary_store import-csv")
+        return
+    except Exception as e:
+        print(f"【警告】汇总表也无法写入 ({e})")
+    spool_filename = os.path.join(cache_dir(), "summary_spool.csv")
+    try:
+        os.makedirs(os.path.dirname(spool_filename), exist_ok=True)
+        append_csv(spool_filename, row)
+        print(f"【严重】汇总数据已暂存到本机: {spool_filename}\n        请把其中的行手动并入 {DATA_FILENAME}")
+    except Exception as e:
+        print(f"【严重】保存结果失败: {e}\n        请记下本次汇总数据: {row}")
+
+
+def save_all_data(session, condition_str, factors):
+    """保存汇总数据 (factors 为按列保存到数据库的条件因素) + 反应时日志"""
+    subject_id = session["subject_id"]
+
+    # 1. 保存汇总数据 (数据库和 CSV 在同一事务内写入)
+    row = {
+        'Subject_ID': subject_id,
+        'Condition_Group': condition_str,
+        'Timestamp': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        'PGG_Investment': session["investment"],
+        'Total_Endowment': COND["pgg_endowment"],
+        'Cyberball_Mode': COND["cyberball_mode"],
+    }
+    try:
+        if commit_session(SUMMARY_DB_FILENAME, DATA_FILENAME, session["session_id"], row, socket.gethostname(),
+                          SUMMARY_JOURNAL_MODE,
+                          dict(factors, cyberball_mode=COND["cyberball_mode"], script_version=__version__)):
+            print(f">>> 汇总数据已保存: {DATA_FILENAME}")
+        else:
+            print(f">>> 本次会话的汇总数据已保存过，未重复写入: {session['session_id']}")
+    except Exception as e:
+        save_summary_fallback(row, e)
+
+    # 2. 保存详细反应时日志
+    try:
+        log_filename = close_event_log()
+        print(f">>> 反应时日志已保存: {os.path.abspath(log_filename)}")
+    except Exception as e:
+        print(f"保存日志失败: {e}")
+
+    # 3. 保存计时质量汇总 (每个场景的帧间隔、抖动和掉帧数)
+    timing_filename = f"timing_quality_{session['file_id']}.csv"
+    try:
+        write_timing_summary(timing_filename)
+        print(f">>> 计时质量汇总已保存: {os.path.abspath(timing_filename)}")
+    except Exception as e:
+        print(f"保存计时汇总失败: {e}")
+
+
+def get_user_input(prompt_text, validate=None):
+    """ID 输入框；validate(text) 返回错误提示时拒绝该输入并显示提示"""
+    begin_scene("ID_Input", frame_rate=FRAME_RATES["input"])
+    input_box = pygame.Rect(SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2, 200, 50)
+    err_rect = pygame.Rect(0, SCREEN_HEIGHT // 2 + 110, SCREEN_WIDTH, get_font(24).get_height())
+    color_active = pygame.Color('dodgerblue2')
+    text = ''
+    error_msg = ''
+    shown_error = ''
+    font = get_font(32)
+
+    def draw(surface):
+        surface.fill(BG_COLOR)
+        title_rect = pygame.Rect(100, SCREEN_HEIGHT // 2 - 150, SCREEN_WIDTH - 200, 100)
+        draw_text_wrapped(surface, prompt_text, TEXT_COLOR, title_rect, get_font(36))
+        hint = get_font(24).render("输入后按 [回车] 确认", True, (150, 150, 150))
+        surface.blit(hint, (SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2 + 70))
+
+    layer = show_static_scene(screen, ("ID_Input", prompt_text), draw)
+    scene_onset = last_flip_ns()
+    startup.first_frame()
+    changed = True
+    done = False
+    while not done:
+        for event in pygame.event.get():
+            event_ns = now_ns()
+            if event.type == pygame.QUIT:
+                pygame.quit();
+                sys.exit()
+            if event.type == pygame.KEYDOWN:
+                rt = elapsed_ms(scene_onset, event_ns)
+                key_name = pygame.key.name(event.key)
+                changed = True
+                if event.key == pygame.K_RETURN:
+                    record_event("ID_Input", "RETURN", rt, f"Confirm: {text}", scene_onset, event_ns)
+                    if len(text) > 0:
+                        error_msg = (validate(text) if validate else None) or ''
+                        if error_msg:
+                            record_event("ID_Input", "REJECT", rt, error_msg, scene_onset, event_ns)
+                        else:
+                            done = True
+                elif event.key == pygame.K_BACKSPACE:
+                    record_event("ID_Input", "BACKSPACE", rt, "Delete char", scene_onset, event_ns)
+                    text = text[:-1]
+                    error_msg = ''
+                else:
+                    if event.unicode.isalnum():
+                        record_event("ID_Input", key_name, rt, f"Type: {event.unicode}", scene_onset, event_ns)
+                        text += event.unicode
+                        error_msg = ''
+        if error_msg != shown_error:
+            restore_rects(screen, layer, [err_rect])
+            if error_msg:
+                err_surf = get_font(24).render(error_msg, True, (255, 100, 100))
+                screen.blit(err_surf, (SCREEN_WIDTH // 2 - err_surf.get_width() // 2, err_rect.y))
+            update_rects([err_rect])
+            shown_error = error_msg
+        if changed:
+            # 只刷新输入框 (新旧位置的并集)
+            dirty = input_box.copy()
+            txt_surf = font.render(text, True, color_active)
+            input_box.w = max(200, txt_surf.get_width() + 10)
+            input_box.centerx = SCREEN_WIDTH // 2
+            dirty.union_ip(input_box)
+            restore_rects(screen, layer, [dirty])
+            screen.blit(txt_surf, (input_box.x + 5, input_box.y + 5))
+            pygame.draw.rect(screen, color_active, input_box, 2)
+            update_rects([dirty])
+            changed = False
+        pace_frame(clock)
+    return text
+
+
+def scene_posture_instruction(posture_type):
+    begin_scene("Posture_Instruction")
+    title_text = "【任务准备：姿势调整】"
+    if posture_type == 'defensive':
+        instruction = _texts["posture_defensive"]
+        accent_color = (255, 100, 100)
+    else:
+        instruction = _texts["posture_neutral"]
+        accent_color = (100, 255, 100)
+
+    def draw(surface):
+        surface.fill(BG_COLOR)
+        title = get_font(40).render(title_text, True, HIGHLIGHT_COLOR)
+        surface.blit(title, (SCREEN_WIDTH // 2 - title.get_width() // 2, int(SCREEN_HEIGHT * 0.1)))
+        text_rect = pygame.Rect(int(SCREEN_WIDTH * 0.15), int(SCREEN_HEIGHT * 0.25), int(SCREEN_WIDTH * 0.7),
+                                int(SCREEN_HEIGHT * 0.6))
+        draw_text_wrapped(surface, instruction, TEXT_COLOR, text_rect, get_font(32), line_spacing=20)
+        pygame.draw.rect(surface, accent_color,
+                         (int(SCREEN_WIDTH * 0.1), int(SCREEN_HEIGHT * 0.25), 10, int(SCREEN_HEIGHT * 0.5)))
+        hint = get_font(24).render("调整好姿势后，按 [空格键] 继续", True, (150, 150, 150))
+        surface.blit(hint, (SCREEN_WIDTH // 2 - 150, SCREEN_HEIGHT - 100))
+
+    layer = show_static_scene(screen, ("Posture_Instruction", posture_type), draw)
+    scene_onset = last_flip_ns()
+    _, event_ns = wait_for_key([pygame.K_SPACE], redraw=lambda: present_layer(screen, layer))
+    rt = elapsed_ms(scene_onset, event_ns)
+    record_event("Posture_Instruction", "SPACE", rt, f"Type: {posture_type}", scene_onset, event_ns)
+
+
+def scene_cyberball_instruction():
+    begin_scene("Cyberball_Instruction")
+    text_rect = pygame.Rect(int(SCREEN_WIDTH * 0.15), int(SCREEN_HEIGHT * 0.2), int(SCREEN_WIDTH * 0.7),
+                            int(SCREEN_HEIGHT * 0.6))
+
+    def draw(surface):
+        surface.fill(BG_COLOR)
+        pygame.draw.rect(surface, (30, 30, 30), text_rect.inflate(40, 40))
+        pygame.draw.rect(surface, (100, 100, 255), text_rect.inflate(40, 40), 2)
+        draw_text_wrapped(surface, _texts["cyberball_instruction"], TEXT_COLOR, text_rect, get_font(30),
+                          line_spacing=15)
+        hint = get_font(24).render("按 [空格键] 开始匹配", True, HIGHLIGHT_COLOR)
+        surface.blit(hint, (SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT - 150))
+
+    layer = show_static_scene(screen, "Cyberball_Instruction", draw)
+    scene_onset = last_flip_ns()
+    _, event_ns = wait_for_key([pygame.K_SPACE], redraw=lambda: present_layer(screen, layer))
+    rt = elapsed_ms(scene_onset, event_ns)
+    record_event("Cyberball_Instruction", "SPACE", rt, "Start Matching", scene_onset, event_ns)
+
+
+def scene_matching(subject_id):
+    """匹配玩家的封面动画：消息按随机间隔 (以被试编号为种子) 依次出现，CONNECTING 后的省略号持续跳动"""
+    begin_scene("Matching", frame_rate=FRAME_RATES["animation"])
+    messages = _texts["matching"]
+    seed = f"matching-{subject_id}"
+    rng = random.Random(seed)
+    # 每条消息出现后停留 0.5~1.5 秒，最后一条之后再停留 1 秒
+    durations = [rng.uniform(500, 1500) * TIME_SCALE for _ in messages] + [1000 * TIME_SCALE]
+    ends = timeline(durations)
+    start_y = int(SCREEN_HEIGHT * 0.3)
+    scene_onset = None
+    shown = None
+    while True:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit();
+                sys.exit()
+            if event.type in REDRAW_EVENTS:
+                shown = None
+        t_ms = 0 if scene_onset is None else elapsed_ms(scene_onset, now_ns())
+        step, _ = locate(ends, t_ms)
+        state = (min(step + 1, len(messages)), int(t_ms / 500) % 4)  # (显示的消息数, 省略号个数)
+        if state != shown:
+            screen.fill(BG_COLOR)
+            loading_text = get_font(40).render("CONNECTING" + "." * state[1], True, (100, 255, 100))
+            screen.blit(loading_text, (SCREEN_WIDTH // 2 - 100, int(SCREEN_HEIGHT * 0.15)))
+            y_offset = start_y
+            for m in messages[:state[0]]:
+                text_surf = get_font(28).render(m, True, TEXT_COLOR)
+                screen.blit(text_surf, (int(SCREEN_WIDTH * 0.2), y_offset))
+                y_offset += 40
+            flip_display()
+            shown = state
+            if scene_onset is None:
+                scene_onset = last_flip_ns()
+                record_event("Matching", "START", 0,
+                             f"Seed: {seed}; Steps_ms: {','.join(f'{d:.0f}' for d in durations)}",
+                             scene_onset, scene_onset)
+        if step >= len(ends):
+            break
+        pace_frame(clock)
+    end_ns = now_ns()
+    record_event("Matching", "END", elapsed_ms(scene_onset, end_ns), f"Messages: {len(messages)}", scene_onset, end_ns)
+
+
+def scene_ready_to_launch_cyberball(subject_id, condition_id):
+    """等待按空格启动 Cyberball"""
+    begin_scene("Ready_To_Launch")
+    instruction_text = _texts["ready"].format(subject_id=subject_id, condition_id=condition_id)
+
+    def draw(surface):
+        surface.fill(BG_COLOR)
+        text_rect = pygame.Rect(int(SCREEN_WIDTH * 0.15), int(SCREEN_HEIGHT * 0.2), int(SCREEN_WIDTH * 0.7), 400)
+        draw_text_wrapped(surface, instruction_text, HIGHLIGHT_COLOR, text_rect, get_font(32), line_spacing=15)
+        hint = get_font(24).render("按 [空格键] 调出 Cyberball 窗口", True, (150, 150, 150))
+        surface.blit(hint, (SCREEN_WIDTH // 2 - hint.get_width() // 2, SCREEN_HEIGHT - 100))
+
+    layer = show_static_scene(screen, ("Ready_To_Launch", subject_id, condition_id), draw)
+    scene_onset = last_flip_ns()
+    _, event_ns = wait_for_key([pygame.K_SPACE], redraw=lambda: present_layer(screen, layer))
+    rt = elapsed_ms(scene_onset, event_ns)
+    record_event("Ready_To_Launch", "SPACE", rt, "Launch Cyberball", scene_onset, event_ns)
+    return True
+
+
+def start_cyberball_process(subject_id, condition_id):
+    """启动 Cyberball 进程 (条件表指定了脚本且脚本存在时一并加载)"""
+    import subprocess
+
+    id_args = [arg.format(subject_id=subject_id, condition_id=condition_id) for arg in CYBERBALL_ID_ARGS or []]
+    script_name = COND["cyberball_script"]
+    if script_name is None:
+        return subprocess.Popen([CYBERBALL_PATH] + id_args)
+    work_dir = os.path.dirname(CYBERBALL_PATH)
+    script_path = os.path.join(work_dir, script_name)
+    if os.path.exists(script_path):
+        process = subprocess.Popen([CYBERBALL_PATH, script_path] + id_args, cwd=work_dir)
+        print(f">>> 启动 Cyberball 并加载脚本: {script_name}")
+    else:
+        process = subprocess.Popen([CYBERBALL_PATH] + id_args, cwd=work_dir)
+        print(">>> 启动 Cyberball (未加载脚本)")
+    return process
+
+
+def cyberball_windows(pyautogui):
+    """标题含 CYBERBALL_WINDOW_TITLE 的全部窗口 (pyautogui 不支持查询窗口时返回 None)"""
+    get_windows = getattr(pyautogui, "getWindowsWithTitle", None)
+    if get_windows is None:
+        return None
+    return get_windows(CYBERBALL_WINDOW_TITLE)
+
+
+def window_pid(window):
+    """窗口所属进程的 PID (仅 Windows 上可查，其他情况返回 None)"""
+    hwnd = getattr(window, "_hWnd", None)
+    if hwnd is None or not sys.platform.startswith("win"):
+        return None
+    import ctypes
+    pid = ctypes.c_ulong()
+    ctypes.windll.user32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
+    return pid.value or None
+
+
+def wait_for_cyberball_window(process, pyautogui, existing):
+    """
+    轮询 Cyberball 窗口出现，返回 (状态, 窗口)。
+    标题按子串匹配，安装目录的资源管理器窗口等也会命中，因此只接受本次启动的进程的窗口：
+    能查到 PID 时要求与 process.pid 一致，否则要求不在启动前已有的窗口 existing 中。
+    状态: window (窗口已出现) / timeout (超时) / exited (进程已退出) / fixed_delay (无法查询窗口，固定等待)
+    """
+    if existing is None:
+        time.sleep(CYBERBALL_READY_FALLBACK)
+        return "fixed_delay", None
+    deadline = time.monotonic() + CYBERBALL_READY_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            return "exited", None
+        for window in cyberball_windows(pyautogui):
+            pid = window_pid(window)
+            if pid == process.pid or (pid is None and window not in existing):
+                return "window", window
+        time.sleep(0.05)
+    return "timeout", None
+
+
+def run_cyberball(subject_id, condition_id):
+    """启动 Cyberball，就绪后自动填写 ID/Condition，并阻塞等待其结束 (启动耗时记入日志)"""
+    try:
+        pyautogui = existing = None
+        if CYBERBALL_ID_ARGS is None:
+            pyautogui = load_pyautogui()
+            if pyautogui is not None:
+                existing = cyberball_windows(pyautogui)  # 启动前已经存在的同名窗口
+        spawn_ns = now_ns()
+        process = start_cyberball_process(subject_id, condition_id)
+        if CYBERBALL_ID_ARGS is not None:
+            status, window = "args", None
+        elif pyautogui is None:
+            status, window = "no_pyautogui", None
+        else:
+            status, window = wait_for_cyberball_window(process, pyautogui, existing)
+        ready_ns = now_ns()
+        launch_ms = elapsed_ms(spawn_ns, ready_ns)
+        record_event("Call_External_Cyberball", "READY", launch_ms, f"Launch: {status}", spawn_ns, ready_ns)
+        print(f">>> Cyberball 启动耗时 {launch_ms:.0f} ms ({status})")
+
+        if status in ("window", "fixed_delay"):
+            if window is not None:
+                try:
+                    window.activate()
+                except Exception:
+                    pass
+            # pyautogui 每次调用后自带 PAUSE (默认 0.1 秒) 的间隔
+            pyautogui.write(subject_id)
+            pyautogui.press('tab')
+            pyautogui.write(condition_id)
+        elif status == "timeout":
+            print(f"【提示】{CYBERBALL_READY_TIMEOUT} 秒内未检测到 Cyberball 窗口，请手动填写 ID 和 Condition")
+        elif status == "no_pyautogui":
+            print("【提示】请手动填写 ID 和 Condition")
+
+        process.wait()
+        exit_ns = now_ns()
+        record_event("Call_External_Cyberball", "EXIT", elapsed_ms(spawn_ns, exit_ns),
+                     f"Return code: {process.returncode}", spawn_ns, exit_ns)
+        print("--- Cyberball 进程已关闭，继续 Pygame 流程 ---")
+    except Exception as e:
+        print(f"Cyberball 运行异常: {e}")
+        traceback.print_exc()
+
+
+def launch_cyberball_process_blocking(subject_id, condition_id):
+    """实验窗口隐藏 (或关闭) 后启动 Cyberball 并阻塞等待"""
+    begin_scene("Call_External_Cyberball")
+    print("--- 实验窗口已让出，正在启动 Cyberball ---")
+    if not os.path.exists(CYBERBALL_PATH):
+        print(f"【严重错误】找不到 Cyberball 程序！请检查路径: {CYBERBALL_PATH}")
+        input("按回车键跳过 Cyberball 启动...")
+        return
+    run_cyberball(subject_id, condition_id)
+
+
+def scene_call_external_cyberball(subject_id, condition_id):
+    """不关闭窗口，在提示画面下启动 Cyberball"""
+    begin_scene("Call_External_Cyberball")
+    screen.fill(BG_COLOR)
+    instruction_text = _texts["ready"].format(subject_id=subject_id, condition_id=condition_id)
+    text_rect = pygame.Rect(int(SCREEN_WIDTH * 0.2), int(SCREEN_HEIGHT * 0.3), int(SCREEN_WIDTH * 0.6), 400)
+    draw_text_wrapped(screen, instruction_text, HIGHLIGHT_COLOR, text_rect, get_font(32), line_spacing=15)
+    hint = get_font(24).render("程序正在启动，请勿关闭...", True, (150, 150, 150))
+    screen.blit(hint, (SCREEN_WIDTH // 2 - 120, SCREEN_HEIGHT - 100))
+    flip_display()
+    pause(1.5)
+
+    if not os.path.exists(CYBERBALL_PATH):
+        screen.fill((50, 0, 0))
+        err_msg = f"错误：找不到 Cyberball 程序！\n请检查路径:\n{CYBERBALL_PATH}\n按回车键跳过。"
+        draw_text_wrapped(screen, err_msg, TEXT_COLOR, pygame.Rect(100, 200, 800, 400), get_font(30))
+        flip_display()
+        wait_for_key([pygame.K_RETURN])
+        return
+    run_cyberball(subject_id, condition_id)
+
+
+def scene_cyberball_game(subject_id, cyberball_type):
+    """
+    内置 Cyberball：在实验窗口内传球，被试拿到球后点击其他玩家传出。
+    每次传球都记入日志 (Key 为 CLICK / NPC，onset 为接到球的时间，event 为传出的时间)。
+    """
+    begin_scene("Cyberball_Game", frame_period_ms=1000 / FRAME_RATES["animation"],
+                frame_rate=FRAME_RATES["animation"])
+    seed = f"cyberball-{subject_id}"
+    rng = random.Random(seed)
+    positions = [
+        (int(SCREEN_WIDTH * 0.25), int(SCREEN_HEIGHT * 0.3)),
+        (int(SCREEN_WIDTH * 0.75), int(SCREEN_HEIGHT * 0.3)),
+        (int(SCREEN_WIDTH * 0.5), int(SCREEN_HEIGHT * 0.75)),
+    ]
+    ball_radius = 12
+    ball_rect = pygame.Rect(0, 0, ball_radius * 2 + 2, ball_radius * 2 + 2)
+
+    def ball_pos(player):
+        x, y = positions[player]
+        return x + 50, y - 20
+
+    def draw(surface):
+        surface.fill(BG_COLOR)
+        draw_avatar(surface, positions[0][0], positions[0][1], "Player A")
+        draw_avatar(surface, positions[1][0], positions[1][1], "Player B")
+        draw_avatar(surface, positions[2][0], positions[2][1], "You (我)", is_active=True)
+        hint = get_font(24).render("轮到您拿球时，点击另一名玩家把球传给他", True, (150, 150, 150))
+        surface.blit(hint, (SCREEN_WIDTH // 2 - hint.get_width() // 2, SCREEN_HEIGHT - 60))
+
+    layer = show_static_scene(screen, "Cyberball_Game", draw)
+    scene_onset = last_flip_ns()
+    record_event("Cyberball_Game", "START", 0, f"Type: {cyberball_type}; Seed: {seed}; Throws: {cyberball.THROWS}",
+                 scene_onset, scene_onset)
+
+    holder = 0  # 开局由 Player A 持球
+    catch_ns = scene_onset
+    due_ns = catch_ns + int(cyberball.npc_delay_ms(rng) * 1e6)
+    flight = None  # (传球者, 接球者, 出手时间)
+    throws = 0
+    received = 0
+    shown_rect = None
+
+    def throw(target, key, event_ns):
+        nonlocal flight, throws
+        throws += 1
+        note = f"Throw {throws}: {cyberball.PLAYERS[holder]} -> {cyberball.PLAYERS[target]}"
+        record_event("Cyberball_Game", key, elapsed_ms(catch_ns, event_ns), note, catch_ns, event_ns)
+        flight = (holder, target, event_ns)
+
+    while throws < cyberball.THROWS or flight is not None:
+        for event in pygame.event.get():
+            event_ns = now_ns()
+            if event.type == pygame.QUIT:
+                pygame.quit();
+                sys.exit()
+            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and holder == cyberball.YOU \
+                    and flight is None:
+                for target in (0, 1):
+                    x, y = positions[target]
+                    if math.hypot(event.pos[0] - x, event.pos[1] - y) <= 60:
+                        throw(target, "CLICK", event_ns)
+                        break
+
+        now = now_ns()
+        if flight is None and holder != cyberball.YOU and now >= due_ns and throws < cyberball.THROWS:
+            throw(cyberball.npc_target(rng, holder, cyberball_type, received), "NPC", now)
+
+        if flight is not None:
+            thrower, target, start_ns = flight
+            t = min(1.0, (now - start_ns) / 1e6 / cyberball.FLIGHT_MS)
+            (x0, y0), (x1, y1) = ball_pos(thrower), ball_pos(target)
+            center = (x0 + (x1 - x0) * t, y0 + (y1 - y0) * t - math.sin(math.pi * t) * 80)
+            if t >= 1.0:
+                flight = None
+                holder = target
+                catch_ns = now
+                if holder == cyberball.YOU:
+                    received += 1
+                else:
+                    due_ns = now + int(cyberball.npc_delay_ms(rng) * 1e6)
+        else:
+            center = ball_pos(holder)
+
+        # 每帧只刷新球的新旧位置 (持球不动时也提交，帧间隔统计才连续)
+        new_rect = ball_rect.copy()
+        new_rect.center = (int(center[0]), int(center[1]))
+        dirty = [new_rect] if shown_rect is None else [shown_rect, new_rect]
+        restore_rects(screen, layer, dirty)
+        pygame.draw.circle(screen, TEXT_COLOR, new_rect.center, ball_radius)
+        update_rects(dirty)
+        shown_rect = new_rect
+        pace_frame(clock)
+
+    end_ns = now_ns()
+    record_event("Cyberball_Game", "END", elapsed_ms(scene_onset, end_ns), f"Received: {received}", scene_onset, end_ns)
+    return received
+
+
+def scene_loading_results(subject_id):
+    """分析结果的封面动画：进度条分四段推进，每段时长随机 (以被试编号为种子)，段内缓入缓出"""
+    begin_scene("Loading_Results", frame_period_ms=1000 / FRAME_RATES["animation"],
+                frame_rate=FRAME_RATES["animation"])
+    # (该段结束时的进度 %, 提示文字)
+    stages = [(30, "正在上传行为数据..."), (60, "正在计算交互频率..."), (90, "正在生成个性化报告..."), (100, "分析完成")]
+    seed = f"loading-{subject_id}"
+    rng = random.Random(seed)
+    # 平均每 1% 约 62.5 ms (整段约 6 秒)，每段上下浮动 30%
+    durations = []
+    start_pct = 0
+    for end_pct, _ in stages:
+        durations.append((end_pct - start_pct) * 62.5 * rng.uniform(0.7, 1.3) * TIME_SCALE)
+        start_pct = end_pct
+    ends = timeline(durations)
+    bar_width = int(SCREEN_WIDTH * 0.6)
+    bar_x = (SCREEN_WIDTH - bar_width) // 2
+    bar_y = int(SCREEN_HEIGHT * 0.5)
+    bar_rect = pygame.Rect(bar_x, bar_y, bar_width, 30)
+    sub_rect = pygame.Rect(0, bar_y - 50, SCREEN_WIDTH, get_font(24).get_height())
+    sub_surfs = [get_font(24).render(text, True, (200, 200, 200)) for _, text in stages]
+
+    def draw(surface):
+        surface.fill(BG_COLOR)
+        title = get_font(40).render("系统正在分析您的表现", True, TEXT_COLOR)
+        surface.blit(title, (SCREEN_WIDTH // 2 - title.get_width() // 2, int(SCREEN_HEIGHT * 0.3)))
+        pygame.draw.rect(surface, (50, 50, 50), bar_rect)
+
+    layer = show_static_scene(screen, "Loading_Results", draw)
+    scene_onset = last_flip_ns()
+    record_event("Loading_Results", "START", 0,
+                 f"Seed: {seed}; Stages_ms: {','.join(f'{d:.0f}' for d in durations)}", scene_onset, scene_onset)
+    while True:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit();
+                sys.exit()
+            if event.type in REDRAW_EVENTS:
+                present_layer(screen, layer)
+        stage, x = locate(ends, elapsed_ms(scene_onset, now_ns()))
+        if stage < len(stages):
+            progress = tween(stages[stage - 1][0] if stage else 0, stages[stage][0], x)
+        else:
+            stage, progress = len(stages) - 1, 100
+        # 只刷新提示文字和进度条
+        restore_rects(screen, layer, [sub_rect, bar_rect])
+        sub_text = sub_surfs[stage]
+        screen.blit(sub_text, (SCREEN_WIDTH // 2 - sub_text.get_width() // 2, bar_y - 50))
+        pygame.draw.rect(screen, BAR_COLOR, (bar_x, bar_y, int(bar_width * (progress / 100)), 30))
+        update_rects([sub_rect, bar_rect])
+        if progress >= 100:
+            break
+        pace_frame(clock)
+    end_ns = now_ns()
+    record_event("Loading_Results", "END", elapsed_ms(scene_onset, end_ns), "Progress: 100", scene_onset, end_ns)
+
+
+def scene_feedback():
+    """归因反馈 (文案由条件决定)"""
+    begin_scene("Feedback_Read")
+    text_rect = pygame.Rect(int(SCREEN_WIDTH * 0.15), int(SCREEN_HEIGHT * 0.2), int(SCREEN_WIDTH * 0.7),
+                            int(SCREEN_HEIGHT * 0.6))
+
+    def draw(surface):
+        surface.fill(BG_COLOR)
+        pygame.draw.rect(surface, (255, 255, 255), text_rect.inflate(60, 60), 2)
+        draw_text_wrapped(surface, _texts["feedback"], TEXT_COLOR, text_rect, get_font(30))
+        hint = get_font(24).render("请阅读以上报告，按 [空格键] 继续...", True, (150, 150, 150))
+        surface.blit(hint, (SCREEN_WIDTH // 2 - 150, SCREEN_HEIGHT - 130))
+
+    layer = show_static_scene(screen, "Feedback_Read", draw)
+    scene_onset = last_flip_ns()
+    _, event_ns = wait_for_key([pygame.K_SPACE], redraw=lambda: present_layer(screen, layer))
+    rt = elapsed_ms(scene_onset, event_ns)
+    record_event("Feedback_Read", "SPACE", rt, "Finish Reading", scene_onset, event_ns)
+
+
+def scene_call_experimenter():
+    begin_scene("Call_Experimenter")
+
+    def draw(surface):
+        surface.fill(BG_COLOR)
+        pygame.draw.circle(surface, HIGHLIGHT_COLOR, (SCREEN_WIDTH // 2, int(SCREEN_HEIGHT * 0.3)), 50)
+        exclam = get_font(70).render("!", True, BG_COLOR)
+        surface.blit(exclam, (SCREEN_WIDTH // 2 - exclam.get_width() // 2, int(SCREEN_HEIGHT * 0.3) - 20))
+        title = get_font(40).render("请暂停实验", True, TEXT_COLOR)
+        surface.blit(title, (SCREEN_WIDTH // 2 - title.get_width() // 2, int(SCREEN_HEIGHT * 0.4)))
+        msg = "请举手示意主试，并填写纸质问卷。\n\n填写完成后，请主试按 [空格键] 继续实验。"
+        text_rect = pygame.Rect(int(SCREEN_WIDTH * 0.2), int(SCREEN_HEIGHT * 0.5), int(SCREEN_WIDTH * 0.6), 300)
+        draw_text_wrapped(surface, msg, TEXT_COLOR, text_rect, get_font(32), line_spacing=15)
+
+    layer = show_static_scene(screen, "Call_Experimenter", draw)
+    scene_onset = last_flip_ns()
+    _, event_ns = wait_for_key([pygame.K_SPACE], redraw=lambda: present_layer(screen, layer))
+    rt = elapsed_ms(scene_onset, event_ns)
+    record_event("Call_Experimenter", "SPACE", rt, "Resume Experiment", scene_onset, event_ns)
+
+
+def scene_pgg_instruction():
+    begin_scene("PGG_Instruction")
+    text_rect = pygame.Rect(int(SCREEN_WIDTH * 0.15), int(SCREEN_HEIGHT * 0.15), int(SCREEN_WIDTH * 0.7),
+                            int(SCREEN_HEIGHT * 0.7))
+
+    def draw(surface):
+        surface.fill(BG_COLOR)
+        draw_text_wrapped(surface, _texts["pgg_instruction"], TEXT_COLOR, text_rect, get_font(32), line_spacing=12)
+        hint = get_font(24).render(_texts["pgg_hint"], True, HIGHLIGHT_COLOR)
+        surface.blit(hint, (SCREEN_WIDTH // 2 - hint.get_width() // 2, SCREEN_HEIGHT - 100))
+
+    layer = show_static_scene(screen, "PGG_Instruction", draw)
+    scene_onset = last_flip_ns()
+    _, event_ns = wait_for_key([pygame.K_SPACE], redraw=lambda: present_layer(screen, layer))
+    rt = elapsed_ms(scene_onset, event_ns)
+    record_event("PGG_Instruction", "SPACE", rt, COND["pgg_note"], scene_onset, event_ns)
+
+
+def scene_necessity_manipulation(necessity_type):
+    """
+    必要性操纵场景：高必要性为红色警示 (生存模式)，低必要性为绿色安全色 (常规模式)
+    """
+    begin_scene("Necessity_Manip")
+    style = NECESSITY_STYLES[necessity_type]
+    border_color = style["border"]
+    text_rect = pygame.Rect(int(SCREEN_WIDTH * 0.2), int(SCREEN_HEIGHT * 0.2), int(SCREEN_WIDTH * 0.6),
+                            int(SCREEN_HEIGHT * 0.6))
+
+    def draw(surface):
+        surface.fill(BG_COLOR)
+
+        # 1. 背景框
+        pygame.draw.rect(surface, style["box"], text_rect.inflate(40, 40))
+        pygame.draw.rect(surface, border_color, text_rect.inflate(40, 40), 4)
+
+        # 2. 标题
+        title_surf = get_font(50).render(style["title"], True, border_color)
+        surface.blit(title_surf, (SCREEN_WIDTH // 2 - title_surf.get_width() // 2, int(SCREEN_HEIGHT * 0.1)))
+
+        # 3. 正文
+        draw_text_wrapped(surface, _texts["necessity"], TEXT_COLOR, text_rect, get_font(32), line_spacing=15)
+
+        # 4. 底部提示
+        hint = get_font(24).render("按 [空格键] 开始投资", True, (150, 150, 150))
+        surface.blit(hint, (SCREEN_WIDTH // 2 - hint.get_width() // 2, SCREEN_HEIGHT - 100))
+
+    layer = show_static_scene(screen, ("Necessity_Manip", necessity_type), draw)
+    scene_onset = last_flip_ns()
+    _, event_ns = wait_for_key([pygame.K_SPACE], redraw=lambda: present_layer(screen, layer))
+    rt = elapsed_ms(scene_onset, event_ns)
+    record_event("Necessity_Manip", "SPACE", rt, style["note"], scene_onset, event_ns)
+
+
+def draw_avatar(surface, x, y, label, is_active=False):
+    color = HIGHLIGHT_COLOR if is_active else NPC_COLOR
+    pygame.draw.circle(surface, color, (x, y), 40)
+    rect = pygame.Rect(x - 40, y + 10, 80, 60)
+    pygame.draw.arc(surface, color, rect, 0, 3.14, 80)
+    lbl_s = get_font(24).render(label, True, TEXT_COLOR)
+    surface.blit(lbl_s, (x - lbl_s.get_width() // 2, y + 55))
+
+
+def scene_pgg_game_visual():
+    begin_scene("PGG_Game", frame_rate=FRAME_RATES["input"])
+    endowment = COND["pgg_endowment"]
+    input_text = ""
+    error_msg = ""
+    error_timer = 0
+    font = get_font(32)
+
+    pos_npc1 = (int(SCREEN_WIDTH * 0.25), int(SCREEN_HEIGHT * 0.3))
+    pos_npc2 = (int(SCREEN_WIDTH * 0.75), int(SCREEN_HEIGHT * 0.3))
+    pos_you = (int(SCREEN_WIDTH * 0.5), int(SCREEN_HEIGHT * 0.75))
+    input_box = pygame.Rect(pos_you[0] - 80, pos_you[1] - 80, 160, 50)
+    err_rect = pygame.Rect(0, int(SCREEN_HEIGHT * 0.85), SCREEN_WIDTH, get_font(24).get_height())
+
+    def draw(surface):
+        surface.fill(BG_COLOR)
+        pygame.draw.line(surface, (50, 50, 50), pos_npc1, pos_npc2, 2)
+        pygame.draw.line(surface, (50, 50, 50), pos_npc1, pos_you, 2)
+        pygame.draw.line(surface, (50, 50, 50), pos_npc2, pos_you, 2)
+        draw_avatar(surface, pos_npc1[0], pos_npc1[1], "Player A")
+        draw_avatar(surface, pos_npc2[0], pos_npc2[1], "Player B")
+        draw_avatar(surface, pos_you[0], pos_you[1], "You (我)", is_active=True)
+
+        prompt = f"您拥有 {endowment} 代币。请问您要投入公共池多少？"
+        prompt_s = get_font(36).render(prompt, True, TEXT_COLOR)
+        surface.blit(prompt_s, (SCREEN_WIDTH // 2 - prompt_s.get_width() // 2, int(SCREEN_HEIGHT * 0.1)))
+
+        pygame.draw.rect(surface, (50, 50, 50), input_box)
+        pygame.draw.rect(surface, HIGHLIGHT_COLOR, input_box, 2)
+
+    layer = show_static_scene(screen, ("PGG_Game", endowment), draw)
+    scene_onset = last_flip_ns()
+    shown_text = None
+    shown_error = None
+    done = False
+    while not done:
+        for event in pygame.event.get():
+            event_ns = now_ns()
+            if event.type == pygame.QUIT:
+                pygame.quit();
+                sys.exit()
+            if event.type == pygame.KEYDOWN:
+                rt = elapsed_ms(scene_onset, event_ns)
+                key_name = pygame.key.name(event.key)
+                if event.key == pygame.K_RETURN:
+                    record_event("PGG_Game", "RETURN", rt, f"Confirm: {input_text}", scene_onset, event_ns)
+                    if len(input_text) > 0:
+                        try:
+                            val = int(input_text)
+                            if 0 <= val <= endowment:
+                                done = True
+                            else:
+                                error_msg = f"请输入 0-{endowment} 的整数"
+                                error_timer = pygame.time.get_ticks()
+                                input_text = ""
+                        except:
+                            pass
+                elif event.key == pygame.K_BACKSPACE:
+                    record_event("PGG_Game", "BACKSPACE", rt, "Delete char", scene_onset, event_ns)
+                    input_text = input_text[:-1]
+                else:
+                    if event.unicode.isnumeric() and len(input_text) < 2:
+                        record_event("PGG_Game", key_name, rt, f"Type: {event.unicode}", scene_onset, event_ns)
+                        input_text += event.unicode
+
+        # 只在输入内容或错误提示变化时刷新对应区域
+        dirty = []
+        if input_text != shown_text:
+            restore_rects(screen, layer, [input_box])
+            txt_surf = font.render(input_text, True, HIGHLIGHT_COLOR)
+            screen.blit(txt_surf, (input_box.x + 10, input_box.y + 10))
+            dirty.append(input_box)
+            shown_text = input_text
+        error_state = error_timer if pygame.time.get_ticks() - error_timer < 2000 else None
+        if error_state != shown_error:
+            restore_rects(screen, layer, [err_rect])
+            if error_state is not None:
+                err_surf = get_font(24).render(error_msg, True, COND["warning_color"])
+                screen.blit(err_surf, (SCREEN_WIDTH // 2 - err_surf.get_width() // 2, int(SCREEN_HEIGHT * 0.85)))
+            dirty.append(err_rect)
+            shown_error = error_state
+        if dirty:
+            update_rects(dirty)
+        pace_frame(clock)
+    return int(input_text)
+
+
+def scene_end():
+    begin_scene("End")
+    screen.fill(BG_COLOR)
+    msg = "实验结束，数据已保存。\n请呼唤主试领取报酬。\n\n按 ESC 退出程序。"
+    text_rect = pygame.Rect(int(SCREEN_WIDTH * 0.2), int(SCREEN_HEIGHT * 0.4), int(SCREEN_WIDTH * 0.6), 400)
+    draw_text_wrapped(screen, msg, TEXT_COLOR, text_rect, get_font(40))
+    flip_display()
+    wait_for_key([pygame.K_ESCAPE])
+    pygame.quit()
+    sys.exit()
+
+
+def step_cyberball_blocking(session):
+    """让出实验窗口运行外部 Cyberball，结束后回到实验窗口 (阶段一 -> 阶段二)"""
+    global screen
+    checkpoint_event_log()  # 启动 Cyberball 前落盘
+    if CYBERBALL_KEEP_WINDOW:
+        hide_window()
+        launch_cyberball_process_blocking(session["subject_id"], session["cyberball_condition"])
+        screen = restore_window((SCREEN_WIDTH, SCREEN_HEIGHT), *display_mode_flags())
+        pygame.display.set_caption("Social Interaction Experiment (Feedback)")
+    else:
+        pygame.quit()
+        launch_cyberball_process_blocking(session["subject_id"], session["cyberball_condition"])
+        init_display("Social Interaction Experiment (Feedback)")
+
+
+def step_cyberball_inline(session):
+    checkpoint_event_log()  # 启动 Cyberball 前落盘
+    scene_call_external_cyberball(session["subject_id"], session["cyberball_condition"])
+
+
+def step_pgg_game(session):
+    session["investment"] = scene_pgg_game_visual()
+
+
+# 条件表中的场景编号 -> 场景 (参数取自本次会话的状态)
+SCENES = {
+    "posture_instruction": lambda session: scene_posture_instruction(session["posture_type"]),
+    "cyberball_instruction": lambda session: scene_cyberball_instruction(),
+    "matching": lambda session: scene_matching(session["subject_id"]),
+    "ready_to_launch": lambda session: scene_ready_to_launch_cyberball(session["subject_id"],
+                                                                       session["cyberball_condition"]),
+    "cyberball_blocking": step_cyberball_blocking,
+    "cyberball_inline": step_cyberball_inline,
+    "cyberball_native": lambda session: scene_cyberball_game(session["subject_id"], COND["cyberball"]),
+    "loading_results": lambda session: scene_loading_results(session["subject_id"]),
+    "feedback": lambda session: scene_feedback(),
+    "call_experimenter": lambda session: scene_call_experimenter(),
+    "pgg_instruction": lambda session: scene_pgg_instruction(),
+    "necessity": lambda session: scene_necessity_manipulation(COND["necessity"]),
+    "pgg_game": step_pgg_game,
+}
+
+
+def main(condition_name):
+    global COND
+    COND = get_condition(condition_name)
+    COND["cyberball_mode"] = resolve_cyberball_mode()
+    COND["scenes"] = resolve_scenes(COND, COND["cyberball_mode"])
+    if CYBERBALL_ID_ARGS is None and "pyautogui" not in sys.modules \
+            and importlib.util.find_spec("pyautogui") is None \
+            and any(scene_id in EXTERNAL_CYBERBALL_SCENES for scene_id in COND["scenes"]):
+        # 只检查是否安装，不导入
+        print("【警告】缺少 pyautogui 库，Cyberball 的 ID 需要手动填写。安装: pip install pyautogui")
+    load_texts(COND)
+    reset_timing()
+    init_display(COND["caption"])
+
+    # 1. 输入 ID (确认时在登记表中登记本次会话，重复编号按 DUPLICATE_ID_POLICY 处理)
+    session_id = uuid.uuid4().hex
+    version = None
+
+    def check_subject_id(text):
+        nonlocal version
+        try:
+            version = register_session(SUMMARY_DB_FILENAME, text, session_id, socket.gethostname(),
+                                       DUPLICATE_ID_POLICY != "block", SUMMARY_JOURNAL_MODE)
+        except Exception as e:
+            print(f"【警告】无法查询被试编号登记表 ({e})，未检查重复编号")
+            return None
+        if version is None:
+            return f"编号 {text} 已有实验记录，请核对后重新输入"
+        if version > 1:
+            print(f">>> 编号 {text} 已有 {version - 1} 个会话，本次数据文件加后缀 _v{version}")
+        return None
+
+    subject_id = get_user_input("请输入被试编号 (ID):", validate=check_subject_id)
+    if version is None:
+        version = unused_file_version(subject_id)
+    file_id = session_file_id(subject_id, version)
+    profiling.set_file_id(file_id)
+    log_fieldnames = (["Subject_ID"] if COND["log_subject_column"] else []) + LOG_FIELDNAMES
+    log_defaults = {"Subject_ID": subject_id} if COND["log_subject_column"] else None
+    open_event_log(COND["log_filename"].format(subject_id=file_id), log_fieldnames, log_defaults)
+
+    # 2. 条件设置 (姿势按被试编号奇偶分配)
+    posture_type = 'defensive' if int(subject_id) % 2 != 0 else 'neutral'
+    session = {
+        "subject_id": subject_id,
+        "cyberball_condition": COND["cyberball_condition"],
+        "posture_type": posture_type,
+        "investment": None,
+        "session_id": session_id,
+        "file_id": file_id,
+    }
+
+    # 3. 按条件表依次运行各场景
+    for scene_id in COND["scenes"]:
+        SCENES[scene_id](session)
+
+    # 保存数据
+    save_all_data(session, condition_record(COND, posture_type), condition_factors(COND, posture_type))
+    print(f">>> 字体缓存统计: {font_cache_stats()}")
+    print(f">>> 排版缓存统计: {layout_cache_stats()}")
+
+    scene_end()
+
+
+def run(condition_name):
+    """条件脚本的入口：运行实验，崩溃时打印错误并等待主试确认"""
+    try:
+        main(condition_name)
+    except Exception:
+        print("\n" + "=" * 40)
+        print("【程序崩溃】错误信息如下:")
+        traceback.print_exc()
+        print("=" * 40)
+        input("按回车键关闭窗口...")
+
+
+# 按场景剖析 (EXP_PROFILE 环境变量开启，见 exp_core/profiling.py)
+if profiling.enabled():
+    profiling.install(sys.modules[__name__])
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if "--startup-report" in args:
+        args.remove("--startup-report")
+        os.environ[startup.REPORT_ENV] = "1"
+    if "--profile" in args:
+        args.remove("--profile")
+        os.environ.setdefault(profiling.PROFILE_ENV, "1")
+        profiling.install(sys.modules[__name__])
+    if len(args) != 1 or args[0] not in CONDITIONS:
+        print(f"用法: python -m exp_core.engine <条件> [--startup-report] [--profile]，"
+              f"可选条件: {', '.join(CONDITIONS)}")
+        sys.exit(1)
+    run(args[0])
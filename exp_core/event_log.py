@@ -0,0 +1,145 @@
+"""
+流式反应时日志：记录按场景缓冲，场景切换时写入 CSV，不在内存中堆积。
+
+记录以列式数组紧凑存储 (场景名/按键名驻留为同一个字符串对象，时间戳为整数纳秒)，
+时间字符串等格式化工作推迟到写出时进行，单条记录只需几百纳秒、几十字节。
+每次切换场景时写出并 flush 到操作系统，在关键节点 (启动 Cyberball 前、保存数据时)
+fsync 到磁盘，程序中途崩溃最多丢失当前场景的记录。
+日志打开之前 (被试 ID 尚未输入完成) 的记录留在缓冲区，打开后立即写出。
+"""
+import csv
+import datetime
+import os
+import sys
+import time
+from array import array
+
+from exp_core import timing
+
+NO_TIME = -1  # 时间戳缺失 (写出为空)
+
+# 当前场景尚未写出的记录 (列式存储)
+_scenes = []
+_keys = []
+_notes = []
+_rts = array('d')
+_wall_ns = array('q')
+_onsets = array('q')
+_events = array('q')
+
+_file = None
+_writer = None
+_filename = None
+_fieldnames = None
+_defaults = {}  # 每条记录统一填充的字段 (如 Subject_ID)
+
+
+def log_event(scene_name, event_key, reaction_time_ms, note="", onset_ns=None, event_ns=None):
+    """追加一条记录 (只做列追加，不做任何格式化)"""
+    _scenes.append(sys.intern(scene_name))
+    _keys.append(sys.intern(str(event_key)))
+    _notes.append(note)
+    _rts.append(reaction_time_ms)
+    _wall_ns.append(time.time_ns())
+    _onsets.append(NO_TIME if onset_ns is None else onset_ns)
+    _events.append(NO_TIME if event_ns is None else event_ns)
+
+
+def buffered_events():
+    """当前缓冲区中尚未写出的记录数"""
+    return len(_scenes)
+
+
+def _format_rows():
+    """把缓冲区的记录格式化为 CSV 行字典"""
+    for i in range(len(_scenes)):
+        wall = datetime.datetime.fromtimestamp(_wall_ns[i] / 1e9)
+        yield {
+            "Scene": _scenes[i],
+            "Timestamp": wall.strftime("%H:%M:%S.%f")[:-3],
+            "Reaction_Time_ms": _rts[i],
+            "Key": _keys[i],
+            "Note": _notes[i],
+            "Onset_ns": "" if _onsets[i] == NO_TIME else _onsets[i],
+            "Event_ns": "" if _events[i] == NO_TIME else _events[i],
+            **_defaults,
+        }
+
+
+def _clear_buffer():
+    for column in (_scenes, _keys, _notes):
+        column.clear()
+    for column in (_rts, _wall_ns, _onsets, _events):
+        del column[:]
+
+
+def open_event_log(filename, fieldnames, defaults=None):
+    """打开 (覆盖) 日志文件并写出已缓冲的记录；打开失败时继续缓冲，保存时重试"""
+    global _filename, _fieldnames, _defaults
+    _filename = filename
+    _fieldnames = fieldnames
+    _defaults = dict(defaults or {})
+    try:
+        _open()
+    except OSError as e:
+        print(f"打开日志失败，记录将暂存在内存中: {e}")
+
+
+def _open():
+    global _file, _writer
+    _file = open(_filename, mode='w', newline='', encoding='utf-8-sig')
+    _writer = csv.DictWriter(_file, fieldnames=_fieldnames)
+    _writer.writeheader()
+    checkpoint_event_log()
+
+
+def flush_event_log():
+    """写出缓冲区并交给操作系统 (进程崩溃不丢数据)"""
+    if _file is None:
+        return
+    _writer.writerows(_format_rows())
+    _clear_buffer()
+    _file.flush()
+
+
+def checkpoint_event_log():
+    """写出缓冲区并 fsync 到磁盘 (断电/系统崩溃也不丢数据)"""
+    if _file is not None:
+        flush_event_log()
+        os.fsync(_file.fileno())
+
+
+def close_event_log():
+    """落盘并关闭日志，返回日志文件名"""
+    global _file, _writer
+    if _file is None:
+        _open()
+    checkpoint_event_log()
+    _file.close()
+    _file = None
+    _writer = None
+    return _filename
+
+
+def reset_event_log():
+    """
+    结束上一个会话遗留的日志状态，使下一个会话从空白开始：
+    日志已打开时写出缓冲区后关闭 (记录仍留在该会话自己的文件里)，未打开时直接丢弃缓冲区。
+    """
+    global _file, _writer, _filename, _fieldnames, _defaults
+    try:
+        if _file is not None:
+            try:
+                flush_event_log()
+            finally:
+                _file.close()
+    except (OSError, ValueError) as e:
+        print(f"关闭日志失败: {e}")
+    finally:
+        _clear_buffer()
+        _file = _writer = _filename = _fieldnames = None
+        _defaults = {}
+
+
+# 场景切换即写出上一场景的记录
+timing.on_scene_change(lambda name: flush_event_log())
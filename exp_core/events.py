@@ -0,0 +1,34 @@
+"""
+事件等待：阅读类场景阻塞在 pygame.event.wait 上，不再空转占满一个 CPU 核心。
+
+按键在到达事件队列时立即返回并打上出队时间戳；
+窗口被遮挡后重新显示、改变大小时调用 redraw() 重绘画面。
+"""
+import sys
+
+import pygame
+
+from exp_core.timing import now_ns
+
+# 单次等待的超时 (毫秒)，超时后回到 Python 层，保证 Ctrl+C 等信号能被及时处理
+WAIT_TIMEOUT_MS = 500
+
+# 需要重绘画面的窗口事件 (旧版 pygame 没有 WINDOW* 常量)
+REDRAW_EVENTS = {getattr(pygame, name) for name in
+                 ("VIDEOEXPOSE", "VIDEORESIZE", "WINDOWEXPOSED", "WINDOWSHOWN",
+                  "WINDOWRESTORED", "WINDOWSIZECHANGED")
+                 if hasattr(pygame, name)}
+
+
+def wait_for_key(keys, redraw=None, timeout_ms=None):
+    """阻塞直到按下 keys 中的任一按键，返回 (KEYDOWN 事件, 出队时间 ns)；关闭窗口时退出程序"""
+    while True:
+        event = pygame.event.wait(timeout_ms or WAIT_TIMEOUT_MS)
+        event_ns = now_ns()
+        if event.type == pygame.QUIT:
+            pygame.quit();
+            sys.exit()
+        if event.type == pygame.KEYDOWN and event.key in keys:
+            return event, event_ns
+        if event.type in REDRAW_EVENTS and redraw is not None:
+            redraw()
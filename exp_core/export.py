@@ -0,0 +1,578 @@
+"""
+把数据目录中的全部会话整合为一个列式数据集，分析时一次载入，不再逐个解析 CSV：
+
+    python -m exp_core.export --dir 数据目录 --out study.npz
+    python -m exp_core.export --dir 数据目录 --out study --format parquet   (需要 pyarrow)
+
+两张表：sessions (每个会话一行，条件因素拆成单独的列，PGG 投入额为整数) 和
+events (每条日志记录一行，session 列为 sessions 表中的行号)。文本列做字典编码：
+<表>.<列> 为 int32 编码，<表>.<列>.categories 为对应的字符串；缺失的整数记为 -1。
+
+.npz 由标准库直接写出 (导出时不需要 numpy)，分析时用 numpy.load 或 load_study() 读取。
+
+--format npy 输出为目录 (每列一个 .npy 文件)，并按增量更新：目录中的 manifest.json 记录已导入的
+日志文件 (文件名、大小、修改时间、SHA-256) 和汇总表已读到的位置，再次运行时只读取新增的日志和
+汇总行并追加到各列末尾，耗时与新增数据量成正比 (已导入的日志只核对文件名，数据库只查询新增的会话)。
+已导入的日志被删除或汇总表已读部分被改动时整体重建；加 --verify 时还核对已导入日志的大小和修改时间，
+内容变化时同样整体重建：
+
+    python -m exp_core.export --dir 数据目录 --out study --format npy
+
+正在进行的会话的日志 (输入编号时创建，每个场景写入一次) 不导入，也不记入清单：日志最后修改后
+LOG_SETTLE_SECONDS 内不导入；还没有汇总行的日志要等 ABANDONED_LOG_SECONDS 无改动 (中途退出的会话)
+才导入。先到的汇总行在清单中等待其日志，因此实验进行期间随时刷新也不会触发重建。
+
+会话由日志文件 (含 _vN 版本) 和汇总表共同确定：只有日志的会话 (中途退出) 也会导出，
+其条件因素为空、投入额取日志中最后一次 PGG 确认的数值。
+"""
+import argparse
+import contextlib
+import csv
+import hashlib
+import io
+import json
+import os
+import pathlib
+import sqlite3
+import sys
+import time
+import zipfile
+from array import array
+
+from exp_core.conditions import get_condition, parse_condition_record, log_filename_templates
+from exp_core.summary_store import log_file_patterns, session_file_id
+
+# 列名 -> 类型 ("cat" 为字典编码的文本，其余为 array 的类型码)
+SESSION_COLUMNS = {
+    "file_id": "cat",
+    "subject_id": "cat",
+    "version": "h",
+    "condition": "cat",
+    "cyberball": "cat",
+    "attribution": "cat",
+    "necessity": "cat",
+    "posture": "cat",
+    "cyberball_mode": "cat",
+    "script_version": "cat",
+    "pgg_threshold": "h",
+    "pgg_endowment": "h",
+    "pgg_multiplier": "h",
+    "investment": "h",
+    "timestamp": "q",  # Unix 时间 (秒)
+    "events": "i",
+}
+EVENT_COLUMNS = {
+    "session": "i",
+    "scene": "cat",
+    "key": "cat",
+    "note": "cat",
+    "rt_ms": "d",
+    "onset_ns": "q",
+    "event_ns": "q",
+}
+
+# array 类型码 -> .npy 的 dtype
+_NPY_DESCR = {"h": "<i2", "i": "<i4", "q": "<i8", "d": "<f8"}
+
+MISSING = -1
+
+MANIFEST_FILENAME = "manifest.json"
+MANIFEST_VERSION = 2
+
+# 可追加的列文件的 .npy 头长度 (固定)：追加数据后原地改写头部的行数
+APPEND_HEADER_SIZE = 128
+
+# 增量更新时，日志最后修改后至少经过这么久 (秒) 才导入：会话结束时先写汇总行，再写完日志
+LOG_SETTLE_SECONDS = 60
+# 没有汇总行的日志最后修改后经过这么久 (秒) 才视为中途退出的会话并导入
+ABANDONED_LOG_SECONDS = 12 * 3600
+
+
+def _int(text):
+    try:
+        return int(text)
+    except (TypeError, ValueError):
+        return MISSING
+
+
+def _timestamp(text):
+    try:
+        return int(time.mktime(time.strptime(text, "%Y-%m-%d %H:%M:%S")))
+    except (TypeError, ValueError):
+        return MISSING
+
+
+def _db_sessions(db_filename, keys):
+    """
+    汇总数据库中 keys 所列的会话：(Subject_ID, Timestamp) -> 该会话的行 (含条件因素列，以及登记表中的版本号
+    version)。按 subject_id 索引逐个查询，只读取这些会话；不迁移旧版数据库，没有的列不出现在行中
+    """
+    if not keys or not os.path.isfile(db_filename):
+        return {}
+    conn = sqlite3.connect(pathlib.Path(db_filename).resolve().as_uri() + "?mode=ro", uri=True)
+    conn.row_factory = sqlite3.Row
+    stored = {}
+    try:
+        for key in keys:
+            for row in conn.execute("SELECT s.*, r.version FROM sessions s "
+                                    "LEFT JOIN subject_sessions r ON r.session_id = s.session_id "
+                                    "WHERE s.subject_id = ? AND s.timestamp = ?", key):
+                stored[key] = dict(row)
+    except sqlite3.Error:
+        return {}
+    finally:
+        conn.close()
+    return stored
+
+
+def read_summary(csv_filename, db_filename):
+    """汇总表 -> {file_id: 汇总行}；版本号优先取自登记表，否则按该编号在表中出现的次序"""
+    if not os.path.isfile(csv_filename):
+        return {}
+    with open(csv_filename, newline='', encoding='utf-8-sig') as f:
+        return _summary_rows(csv.DictReader(f), db_filename, {})
+
+
+def _summary_rows(reader, db_filename, seen):
+    """
+    汇总表的行 -> {file_id: 汇总行}，数据库中有该会话时附上其行 (stored)；
+    seen 为各编号此前已出现的次数 (就地更新)
+    """
+    rows = list(reader)
+    stored = _db_sessions(db_filename, {(row['Subject_ID'], row['Timestamp']) for row in rows})
+    summary = {}
+    for row in rows:
+        subject_id = row['Subject_ID']
+        seen[subject_id] = seen.get(subject_id, 0) + 1
+        stored_row = stored.get((subject_id, row['Timestamp']))
+        version = (stored_row or {}).get("version") or seen[subject_id]
+        summary[session_file_id(subject_id, version)] = dict(row, version=version, stored=stored_row)
+    return summary
+
+
+def find_logs(data_dir):
+    """数据目录中的日志文件 -> [(file_id, 编号, 版本号, 路径)]"""
+    patterns = log_file_patterns(log_filename_templates())
+    logs = []
+    with os.scandir(data_dir) as entries:
+        for entry in entries:
+            for pattern in patterns:
+                match = pattern.fullmatch(entry.name)
+                if match:
+                    version = int(match["v"] or 1)
+                    logs.append((session_file_id(match["id"], version), match["id"], version, entry.path))
+                    break
+    logs.sort()
+    return logs
+
+
+def read_log(path):
+    """一个日志文件 -> events 表的各列 (不含 session 列)"""
+    columns = {name: [] for name in EVENT_COLUMNS if name != "session"}
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        for row in csv.DictReader(f):
+            columns["scene"].append(row.get("Scene") or "")
+            columns["key"].append(row.get("Key") or "")
+            columns["note"].append(row.get("Note") or "")
+            try:
+                columns["rt_ms"].append(float(row.get("Reaction_Time_ms")))
+            except (TypeError, ValueError):
+                columns["rt_ms"].append(float("nan"))
+            columns["onset_ns"].append(_int(row.get("Onset_ns")))
+            columns["event_ns"].append(_int(row.get("Event_ns")))
+    return columns
+
+
+def _logged_investment(events):
+    """日志中最后一次 PGG 确认的投入额"""
+    for scene, key, note in zip(reversed(events["scene"]), reversed(events["key"]), reversed(events["note"])):
+        if scene == "PGG_Game" and key == "RETURN" and note.startswith("Confirm: "):
+            return _int(note[len("Confirm: "):])
+    return MISSING
+
+
+def _factors(summary_row):
+    """
+    会话的条件因素：优先取汇总数据库中保存时写入的列；数据库中没有 (改用数据库之前的会话) 时
+    由 Condition_Group 按当前条件表解析
+    """
+    if not summary_row:
+        return {}
+    stored = summary_row.get("stored") or {}
+    if stored.get("condition"):
+        return dict(stored, pgg_endowment=stored.get("total_endowment"))
+    condition_name, posture = parse_condition_record(summary_row["Condition_Group"])
+    if condition_name is None:
+        return {"cyberball_mode": summary_row.get("Cyberball_Mode")}
+    condition = get_condition(condition_name)
+    return {"condition": condition_name, "cyberball": condition["cyberball"], "attribution": condition["attribution"],
+            "necessity": condition["necessity"], "posture": posture, "pgg_threshold": condition["pgg_threshold"],
+            "pgg_endowment": condition["pgg_endowment"], "pgg_multiplier": condition["pgg_multiplier"],
+            "cyberball_mode": summary_row.get("Cyberball_Mode")}
+
+
+def session_row(file_id, subject_id, version, summary_row, events):
+    """一个会话的 sessions 表行 (缺失的文本为空字符串，缺失的整数为 -1)"""
+    factors = _factors(summary_row)
+    investment = _int(summary_row["PGG_Investment"]) if summary_row else MISSING
+    if investment == MISSING and events is not None:
+        investment = _logged_investment(events)
+    return {
+        "file_id": file_id,
+        "subject_id": subject_id,
+        "version": version,
+        "condition": factors.get("condition") or "",
+        "cyberball": factors.get("cyberball") or "",
+        "attribution": factors.get("attribution") or "",
+        "necessity": factors.get("necessity") or "",
+        "posture": factors.get("posture") or "",
+        "cyberball_mode": factors.get("cyberball_mode") or "",
+        "script_version": factors.get("script_version") or "",
+        "pgg_threshold": _int(factors.get("pgg_threshold")),
+        "pgg_endowment": _int(summary_row["Total_Endowment"]) if summary_row else MISSING,
+        "pgg_multiplier": _int(factors.get("pgg_multiplier")),
+        "investment": investment,
+        "timestamp": _timestamp(summary_row["Timestamp"]) if summary_row else MISSING,
+        "events": len(events["scene"]) if events is not None else 0,
+    }
+
+
+def collect(data_dir, csv_filename="experiment_data.csv", db_filename="experiment_data.sqlite"):
+    """扫描数据目录，返回 {"sessions": {列: [值]}, "events": {列: [值]}}"""
+    summary = read_summary(os.path.join(data_dir, csv_filename), os.path.join(data_dir, db_filename))
+    return build_tables(find_logs(data_dir), summary)
+
+
+def build_tables(logs, summary, first_row=0):
+    """由日志文件 (find_logs 的输出) 和汇总行构建两张表；first_row 为第一个会话在 sessions 表中的行号"""
+    sessions = {name: [] for name in SESSION_COLUMNS}
+    events = {name: [] for name in EVENT_COLUMNS}
+    logged = set()
+    for file_id, subject_id, version, path in logs:
+        log_columns = read_log(path)
+        row = session_row(file_id, subject_id, version, summary.get(file_id), log_columns)
+        index = first_row + len(sessions["file_id"])
+        for name, value in row.items():
+            sessions[name].append(value)
+        events["session"].extend([index] * row["events"])
+        for name, values in log_columns.items():
+            events[name].extend(values)
+        logged.add(file_id)
+    # 有汇总没有日志的会话 (日志被移走等) 也保留
+    for file_id, summary_row in summary.items():
+        if file_id not in logged:
+            row = session_row(file_id, summary_row["Subject_ID"], summary_row["version"], summary_row, None)
+            for name, value in row.items():
+                sessions[name].append(value)
+    return {"sessions": sessions, "events": events}
+
+
+def encode(values, categories=None):
+    """字典编码：返回 (int32 编码, 按首次出现排序的类别)；传入已有类别时沿用其编码，新值追加在末尾"""
+    categories = [] if categories is None else categories
+    index = {value: code for code, value in enumerate(categories)}
+    codes = array("i")
+    for value in values:
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(categories)
+            categories.append(value)
+        codes.append(code)
+    return codes, categories
+
+
+def _npy_header(descr, length, size=None):
+    """魔数 + 版本 (8 字节) + 头长度 (2 字节) + 头；总长对齐到 64 字节，或固定为 size"""
+    header = "{'descr': '%s', 'fortran_order': False, 'shape': (%d,), }" % (descr, length)
+    size = size or -(-(10 + len(header) + 1) // 64) * 64
+    return b"\x93NUMPY\x01\x00" + (size - 10).to_bytes(2, "little") + (header.ljust(size - 11) + "\n").encode("latin1")
+
+
+def _npy(descr, data, length):
+    return _npy_header(descr, length) + data
+
+
+def _typed(values, typecode):
+    typed = array(typecode, values)
+    if sys.byteorder == "big":
+        typed.byteswap()
+    return typed
+
+
+def _string_npy(strings):
+    width = max((len(s) for s in strings), default=1) or 1
+    data = b"".join(s.ljust(width, "\0").encode("utf-32-le") for s in strings)
+    return _npy(f"<U{width}", data, len(strings))
+
+
+def write_npz(path, tables):
+    """按 SESSION_COLUMNS / EVENT_COLUMNS 的类型写出 .npz (numpy.load 可直接读取)"""
+    specs = {"sessions": SESSION_COLUMNS, "events": EVENT_COLUMNS}
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for table, columns in tables.items():
+            for name, kind in specs[table].items():
+                values = columns[name]
+                if kind == "cat":
+                    codes, categories = encode(values)
+                    zf.writestr(f"{table}.{name}.npy", _npy("<i4", _typed(codes, "i").tobytes(), len(codes)))
+                    zf.writestr(f"{table}.{name}.categories.npy", _string_npy(categories))
+                else:
+                    zf.writestr(f"{table}.{name}.npy",
+                                _npy(_NPY_DESCR[kind], _typed(values, kind).tobytes(), len(values)))
+
+
+def _file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _column_names():
+    return {"sessions": list(SESSION_COLUMNS), "events": list(EVENT_COLUMNS)}
+
+
+def _empty_manifest():
+    """sessions 为 file_id -> 在 sessions 表中的行号 (字典，按 file_id 查找不必扫描)"""
+    return {"version": MANIFEST_VERSION, "columns": _column_names(), "rows": {"sessions": 0, "events": 0},
+            "sessions": {}, "files": {}, "categories": {}, "pending": {},
+            "summary": {"size": 0, "sha256": hashlib.sha256().hexdigest(), "fieldnames": None, "counts": {}}}
+
+
+def _read_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST_FILENAME), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_manifest(out_dir, manifest):
+    """先写临时文件再替换：中途中断时仍是上一次完整的清单"""
+    path = os.path.join(out_dir, MANIFEST_FILENAME)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(path + ".tmp", path)
+
+
+def _new_logs(manifest, data_dir, summary, verify=False):
+    """
+    与清单比较数据目录中的日志文件，返回 (可导入的新日志 [find_logs 的元组], 更新后的文件记录,
+    有日志文件的会话)；summary 为尚未导入的汇总行。可能仍在写入的日志跳过，不记入文件记录。
+    已导入的日志被删除时返回 None (需要重建)。已导入的日志只按文件名核对，不再读取其元数据；
+    verify 为真时逐个核对大小和修改时间，有变化的再比较 SHA-256，内容变化时返回 None
+    """
+    files = dict(manifest["files"])
+    ingested = manifest["sessions"]
+    now = time.time()
+    present = set()
+    logged = set()
+    new_logs = []
+    for log in find_logs(data_dir):
+        file_id, path = log[0], log[3]
+        name = os.path.basename(path)
+        present.add(name)
+        logged.add(file_id)
+        entry = files.get(name)
+        if entry is not None and not verify:
+            continue
+        stat = os.stat(path)
+        if entry is None:
+            if file_id in ingested:  # 该会话已由汇总行导入，日志后到
+                return None
+            age = now - stat.st_mtime
+            if age < LOG_SETTLE_SECONDS or (file_id not in summary and age < ABANDONED_LOG_SECONDS):
+                continue  # 会话可能仍在进行，留到下次
+            new_logs.append(log)
+        elif (entry["size"], entry["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+            continue
+        digest = _file_hash(path)
+        if entry is not None and entry["sha256"] != digest:
+            return None
+        files[name] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest}
+    if set(files) - present:
+        return None
+    return new_logs, files, logged
+
+
+def _new_summary_rows(manifest, csv_filename, db_filename):
+    """
+    读取汇总表中清单记录的位置之后新增的行，返回 (新汇总行, 更新后的汇总表记录)；
+    已读部分被改动时返回 None (需要重建)
+    """
+    state = dict(manifest["summary"])
+    if not os.path.isfile(csv_filename):
+        return None if state["size"] else ({}, state)
+    with open(csv_filename, "rb") as f:
+        read = f.read(state["size"])
+        if hashlib.sha256(read).hexdigest() != state["sha256"]:
+            return None
+        new = f.read()
+    new = new[:new.rfind(b"\n") + 1]  # 其他电脑正在写入的半行留到下次
+    text = new.decode("utf-8")
+    if not state["size"]:
+        text = text.lstrip("\ufeff")
+    reader = csv.DictReader(io.StringIO(text, newline=""), fieldnames=state["fieldnames"])
+    counts = dict(state["counts"])
+    rows = _summary_rows(reader, db_filename, counts)
+    state.update(size=state["size"] + len(new), sha256=hashlib.sha256(read + new).hexdigest(),
+                 fieldnames=reader.fieldnames, counts=counts)
+    if any(file_id in manifest["sessions"] for file_id in rows):  # 该会话已由日志导入，汇总后到
+        return None
+    return rows, state
+
+
+def _append_npy(path, descr, data, rows, itemsize):
+    """把 data 追加到列文件末尾 (先截掉上次未完成的写入)，再改写头部的行数"""
+    with open(path, "r+b" if os.path.exists(path) else "w+b") as f:
+        f.truncate(APPEND_HEADER_SIZE + rows * itemsize)
+        f.seek(0)
+        f.write(_npy_header(descr, rows + len(data) // itemsize, APPEND_HEADER_SIZE))
+        f.seek(0, os.SEEK_END)
+        f.write(data)
+
+
+def _append_tables(out_dir, tables, manifest):
+    specs = {"sessions": SESSION_COLUMNS, "events": EVENT_COLUMNS}
+    for table, columns in tables.items():
+        rows = manifest["rows"][table]
+        for name, kind in specs[table].items():
+            path = os.path.join(out_dir, f"{table}.{name}.npy")
+            if kind == "cat":
+                categories = manifest["categories"].setdefault(f"{table}.{name}", [])
+                known = len(categories)
+                codes, _ = encode(columns[name], categories)
+                _append_npy(path, "<i4", _typed(codes, "i").tobytes(), rows, 4)
+                if len(categories) > known or not os.path.exists(path[:-4] + ".categories.npy"):
+                    with open(path[:-4] + ".categories.npy", "wb") as f:
+                        f.write(_string_npy(categories))
+            else:
+                values = _typed(columns[name], kind)
+                _append_npy(path, _NPY_DESCR[kind], values.tobytes(), rows, values.itemsize)
+        manifest["rows"][table] = rows + len(next(iter(columns.values())))
+
+
+def _find_new(manifest, data_dir, csv_filename, db_filename, verify=False):
+    """返回 ((新日志, 文件记录, 有日志的会话), 尚未导入的汇总行, 汇总表记录)；需要重建时返回 None"""
+    summary = _new_summary_rows(manifest, csv_filename, db_filename)
+    if summary is None:
+        return None
+    rows, summary_state = summary
+    rows = {**manifest.get("pending", {}), **rows}
+    logs = _new_logs(manifest, data_dir, rows, verify)
+    if logs is None:
+        return None
+    return logs, rows, summary_state
+
+
+def update_dataset(data_dir, out_dir, csv_filename="experiment_data.csv", db_filename="experiment_data.sqlite",
+                   rebuild=False, verify=False):
+    """
+    增量更新 out_dir 中的列式数据集 (每列一个可追加的 .npy)，只导入清单中没有的会话。
+    verify 为真时还核对已导入日志的内容。返回 (新增会话数, 新增记录数, 是否整体重建)
+    """
+    csv_filename = os.path.join(data_dir, csv_filename)
+    db_filename = os.path.join(data_dir, db_filename)
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = None if rebuild else _read_manifest(out_dir)
+    if manifest is not None and (manifest.get("version") != MANIFEST_VERSION
+                                 or manifest.get("columns") != _column_names()):
+        manifest = None  # 清单格式或列有变化 (程序更新)，整体重建
+    found = _find_new(manifest, data_dir, csv_filename, db_filename, verify) if manifest is not None else None
+    rebuilt = found is None
+    if rebuilt:
+        # 先删清单：重建中途中断时下次仍会重建，不会在残缺的列文件后追加
+        for name in [MANIFEST_FILENAME] + sorted(os.listdir(out_dir)):
+            if name == MANIFEST_FILENAME or name.endswith(".npy"):
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(os.path.join(out_dir, name))
+        manifest = _empty_manifest()
+        found = _find_new(manifest, data_dir, csv_filename, db_filename)
+
+    (new_logs, files, logged), summary, summary_state = found
+    # 汇总行随其日志一起导入；没有日志文件的会话直接导入；日志还在写入的留在清单中等待
+    new_ids = {log[0] for log in new_logs}
+    ready = {file_id: row for file_id, row in summary.items() if file_id in new_ids or file_id not in logged}
+    first_row = manifest["rows"]["sessions"]
+    tables = build_tables(new_logs, ready, first_row)
+    _append_tables(out_dir, tables, manifest)
+    manifest["sessions"].update((file_id, first_row + i) for i, file_id in enumerate(tables["sessions"]["file_id"]))
+    manifest["files"] = files
+    manifest["summary"] = summary_state
+    manifest["pending"] = {file_id: row for file_id, row in summary.items() if file_id not in ready}
+    _write_manifest(out_dir, manifest)
+    return len(tables["sessions"]["file_id"]), len(tables["events"]["session"]), rebuilt
+
+
+def write_parquet(prefix, tables):
+    """写出 <prefix>_sessions.parquet 和 <prefix>_events.parquet (文本列为 Arrow 字典类型)"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    arrow_types = {"h": pa.int16(), "i": pa.int32(), "q": pa.int64(), "d": pa.float64()}
+    specs = {"sessions": SESSION_COLUMNS, "events": EVENT_COLUMNS}
+    for table, columns in tables.items():
+        arrays = {}
+        for name, kind in specs[table].items():
+            if kind == "cat":
+                codes, categories = encode(columns[name])
+                arrays[name] = pa.DictionaryArray.from_arrays(pa.array(codes, pa.int32()),
+                                                              pa.array(categories, pa.string()))
+            else:
+                arrays[name] = pa.array(columns[name], arrow_types[kind])
+        pq.write_table(pa.table(arrays), f"{prefix}_{table}.parquet")
+
+
+def load_study(path, decode=False):
+    """
+    读取 .npz 或 --format npy 的输出目录 (需要 numpy)：{表: {列: ndarray}}；
+    decode=True 时把编码还原为字符串
+    """
+    import numpy as np
+
+    if os.path.isdir(path):
+        arrays = {name[:-4]: np.load(os.path.join(path, name)) for name in os.listdir(path) if name.endswith(".npy")}
+    else:
+        with np.load(path) as data:
+            arrays = {key: data[key] for key in data.files}
+    tables = {}
+    for key, values in arrays.items():
+        if key.endswith(".categories"):
+            continue
+        table, name = key.split(".", 1)
+        if decode and f"{key}.categories" in arrays:
+            values = arrays[f"{key}.categories"][values]
+        tables.setdefault(table, {})[name] = values
+    return tables
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="把全部会话导出为列式数据集")
+    parser.add_argument("--dir", default=".", help="数据目录")
+    parser.add_argument("--out", default="study.npz", help="输出文件 (parquet 格式时为文件名前缀，npy 格式时为目录)")
+    parser.add_argument("--format", choices=["npz", "parquet", "npy"], default="npz")
+    parser.add_argument("--rebuild", action="store_true", help="npy 格式：忽略清单，整体重建")
+    parser.add_argument("--verify", action="store_true", help="npy 格式：核对已导入日志的内容，有变化时整体重建")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    if args.format == "npy":
+        sessions, events, rebuilt = update_dataset(args.dir, args.out, rebuild=args.rebuild, verify=args.verify)
+        print(f">>> {'已重建' if rebuilt else '已增量更新'} {args.out}: 新增 {sessions} 个会话、{events} 条记录 "
+              f"({time.perf_counter() - start:.1f} 秒)")
+        return
+    tables = collect(args.dir)
+    if args.format == "parquet":
+        try:
+            write_parquet(args.out, tables)
+        except ImportError:
+            parser.error("parquet 格式需要 pyarrow：pip install pyarrow")
+    else:
+        write_npz(args.out, tables)
+    print(f">>> 已导出 {len(tables['sessions']['file_id'])} 个会话、{len(tables['events']['session'])} 条记录: "
+          f"{args.out} ({time.perf_counter() - start:.1f} 秒)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+字体缓存：按 (字体族, 字号) 缓存 pygame Font 对象。
+
+原先每帧调用 get_font() 都会经 pygame.font.SysFont 重新解析并打开 TTF 文件，
+这里只在第一次用到某个字号时打开一次，之后直接复用。
+
+字体族 -> 文件路径的解析结果还会持久化到本机当前用户的缓存目录下的 font_index.json
+(脚本放在多台电脑共用的共享目录时，各台电脑的索引互不覆盖)，
+以字体目录的修改时间作为失效依据。Linux 上 pygame.font.match_font
+第一次调用会通过 fontconfig 扫描全部已安装字体 (耗时数秒)，
+索引有效时后续启动完全跳过这一步。
+"""
+import json
+import os
+import sys
+
+import pygame
+
+# 按优先级排列的中文字体
+FONT_NAMES = ['simhei', 'pingfangsc', 'microsoftyahei', 'stheiti', 'arial']
+
+# 各场景用到的全部字号，在显示第一个画面之前预加载
+SCENE_FONT_SIZES = (24, 28, 30, 32, 36, 40, 50, 70)
+
+
+def cache_dir():
+    """本机当前用户的缓存目录 (Windows: %LOCALAPPDATA%，macOS: ~/Library/Caches，其他: ~/.cache)"""
+    home = os.path.expanduser("~")
+    if sys.platform.startswith("win"):
+        base = os.environ.get("LOCALAPPDATA") or os.path.join(home, "AppData", "Local")
+    elif sys.platform == "darwin":
+        base = os.path.join(home, "Library", "Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(home, ".cache")
+    return os.path.join(base, "exp_core")
+
+
+# 字体索引文件 (每台电脑、每个用户各一份)
+FONT_INDEX_PATH = os.path.join(cache_dir(), "font_index.json")
+FONT_INDEX_VERSION = 1
+
+_UNRESOLVED = object()
+
+_default_family = _UNRESOLVED  # 首个可用的字体族 (None 表示使用 pygame 默认字体)
+_font_paths = {}  # 字体族 -> 字体文件路径
+_font_cache = {}  # (字体族, 字号) -> pygame.font.Font
+_stats = {"hits": 0, "misses": 0}
+_index = None  # 磁盘索引中的 {字体族: 路径}，首次使用时加载
+
+
+def font_dirs():
+    """当前平台的系统/用户字体目录"""
+    home = os.path.expanduser("~")
+    if sys.platform.startswith("win"):
+        dirs = [os.path.join(os.environ.get("WINDIR", r"C:\Windows"), "Fonts")]
+        if os.environ.get("LOCALAPPDATA"):
+            dirs.append(os.path.join(os.environ["LOCALAPPDATA"], "Microsoft", "Windows", "Fonts"))
+    elif sys.platform == "darwin":
+        dirs = ["/System/Library/Fonts", "/Library/Fonts", os.path.join(home, "Library", "Fonts")]
+    else:
+        dirs = ["/usr/share/fonts", "/usr/local/share/fonts",
+                os.path.join(home, ".fonts"), os.path.join(home, ".local", "share", "fonts")]
+    return dirs
+
+
+def font_dirs_signature():
+    """字体目录及其一级子目录的修改时间，安装/卸载字体后会发生变化"""
+    signature = {}
+    for top in font_dirs():
+        try:
+            signature[top] = os.stat(top).st_mtime
+            with os.scandir(top) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        signature[entry.path] = entry.stat().st_mtime
+        except OSError:
+            signature[top] = None
+    return signature
+
+
+def _load_index():
+    """读取磁盘索引，字体目录有变化或文件损坏时视为空索引"""
+    global _index
+    if _index is None:
+        _index = {}
+        try:
+            with open(FONT_INDEX_PATH, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == FONT_INDEX_VERSION and data.get("dirs") == font_dirs_signature():
+                _index = data.get("fonts", {})
+        except (OSError, ValueError, AttributeError):
+            pass
+    return _index
+
+
+def _save_index():
+    """写入磁盘索引 (先写临时文件再替换，避免中途退出留下半个文件)"""
+    data = {"version": FONT_INDEX_VERSION, "dirs": font_dirs_signature(), "fonts": _index}
+    tmp_path = FONT_INDEX_PATH + ".tmp"
+    try:
+        os.makedirs(os.path.dirname(FONT_INDEX_PATH), exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, FONT_INDEX_PATH)
+    except OSError as e:
+        print(f"字体索引保存失败: {e}")
+
+
+def resolve_font_path(family):
+    """解析字体族对应的文件路径，每个字体族只查找一次 (优先使用磁盘索引)"""
+    if family not in _font_paths:
+        index = _load_index()
+        path = index.get(family, _UNRESOLVED) if family else None
+        if path is _UNRESOLVED or (path and not os.path.exists(path)):
+            path = pygame.font.match_font(family)
+            index[family] = path
+            _save_index()
+        _font_paths[family] = path
+    return _font_paths[family]
+
+
+def default_family():
+    """按 FONT_NAMES 顺序返回第一个系统中存在的字体族"""
+    global _default_family
+    if _default_family is _UNRESOLVED:
+        _default_family = None
+        for name in FONT_NAMES:
+            if resolve_font_path(name):
+                _default_family = name
+                break
+    return _default_family
+
+
+def get_font(size, family=None):
+    """加载中文字体 (带缓存)"""
+    if family is None:
+        family = default_family()
+    key = (family, size)
+    font = _font_cache.get(key)
+    if font is not None:
+        _stats["hits"] += 1
+        return font
+    _stats["misses"] += 1
+    font = pygame.font.Font(resolve_font_path(family), size)
+    _font_cache[key] = font
+    return font
+
+
+def preload_fonts(sizes=SCENE_FONT_SIZES):
+    """启动时预加载所有场景用到的字号"""
+    for size in sizes:
+        get_font(size)
+
+
+def clear_font_cache():
+    """pygame.quit() 之后 Font 对象失效，需要清空缓存 (字体路径仍然有效，予以保留)"""
+    _font_cache.clear()
+
+
+def font_cache_stats():
+    """返回缓存命中/未命中次数，用于确认帧循环中没有打开新字体"""
+    return {"hits": _stats["hits"], "misses": _stats["misses"], "fonts": len(_font_cache)}
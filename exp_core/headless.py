@@ -0,0 +1,208 @@
+"""
+无界面批量运行：SDL dummy 视频驱动 + 脚本化按键，Cyberball 阶段换成本地模拟，
+用于在 CI (Linux) 上连续跑大量模拟会话，检查整条流程和输出的数据文件。
+
+    python -m exp_core.headless Exc_Ext_High Inc_Int_Low -n 200 --out headless_out
+
+每个场景开始时 (begin_scene) 把脚本中该场景的按键投递到 pygame 事件队列，场景照常读取。
+场景在 SCENE_TIMEOUT_MS 内没有结束视为卡住 (脚本缺少该场景需要的按键)，按关闭窗口处理，
+会话记为失败。
+"""
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import contextlib
+import csv
+import io
+import random
+import sys
+import time
+import traceback
+
+import pygame
+
+from exp_core import cyberball, engine
+from exp_core.conditions import CONDITIONS, get_condition
+from exp_core.event_log import reset_event_log
+from exp_core.summary_store import find_sessions, latest_versions, session_file_id
+from exp_core.timing import now_ns, elapsed_ms, begin_scene, on_scene_change
+
+# 单个场景的最长运行时间 (毫秒)
+SCENE_TIMEOUT_MS = 5000
+
+# 按空格继续的阅读类场景
+SPACE_SCENES = ("Posture_Instruction", "Cyberball_Instruction", "Ready_To_Launch", "Feedback_Read",
+                "Call_Experimenter", "PGG_Instruction", "Necessity_Manip")
+
+_script = {}  # 当前会话: 场景名 -> [按键名]
+_scenes_seen = []  # 当前会话依次进入的场景
+
+
+def session_script(subject_id, investment):
+    """一次会话的按键脚本：场景名 -> 按键名列表 (pygame.key.name 的写法)"""
+    script = {name: ["space"] for name in SPACE_SCENES}
+    script["ID_Input"] = list(subject_id) + ["return"]
+    script["PGG_Game"] = list(str(investment)) + ["return"]
+    script["End"] = ["escape"]
+    return script
+
+
+def key_event(name):
+    unicode = {"return": "\r", "space": " "}.get(name, name if len(name) == 1 else "")
+    return pygame.event.Event(pygame.KEYDOWN, key=pygame.key.key_code(name), unicode=unicode, mod=0, scancode=0)
+
+
+def _on_scene(name):
+    _scenes_seen.append(name)
+    for key in _script.pop(name, []):
+        pygame.event.post(key_event(key))
+    # 每进入一个场景重新计时
+    pygame.time.set_timer(pygame.QUIT, SCENE_TIMEOUT_MS, 1)
+
+
+def fake_cyberball(session):
+    """代替 Cyberball 阶段：按 exp_core/cyberball.py 的传球规则瞬间模拟一局，日志格式与内置版相同"""
+    begin_scene("Cyberball_Game")
+    cyberball_type = engine.COND["cyberball"]
+    seed = f"cyberball-{session['subject_id']}"
+    rng = random.Random(seed)
+    start_ns = now_ns()
+    engine.record_event("Cyberball_Game", "START", 0,
+                        f"Type: {cyberball_type}; Seed: {seed}; Throws: {cyberball.THROWS}", start_ns, start_ns)
+    holder = 0
+    received = 0
+    for throw in range(1, cyberball.THROWS + 1):
+        if holder == cyberball.YOU:
+            target, key = rng.randrange(2), "CLICK"
+        else:
+            target, key = cyberball.npc_target(rng, holder, cyberball_type, received), "NPC"
+        event_ns = now_ns()
+        note = f"Throw {throw}: {cyberball.PLAYERS[holder]} -> {cyberball.PLAYERS[target]}"
+        engine.record_event("Cyberball_Game", key, 0, note, event_ns, event_ns)
+        holder = target
+        if holder == cyberball.YOU:
+            received += 1
+    end_ns = now_ns()
+    engine.record_event("Cyberball_Game", "END", elapsed_ms(start_ns, end_ns), f"Received: {received}",
+                        start_ns, end_ns)
+    return received
+
+
+def install():
+    """切换到批量运行：跳过场景中的固定等待，所有 Cyberball 版本都换成模拟"""
+    engine.TIME_SCALE = 0
+    engine.CYBERBALL_MODE = "native"  # 各平台上的场景顺序一致
+    for scene_id in ("cyberball_blocking", "cyberball_inline", "cyberball_native"):
+        engine.SCENES[scene_id] = fake_cyberball
+    on_scene_change(_on_scene)
+
+
+def run_session(condition_name, subject_id, investment, quiet=True):
+    """按脚本跑完一个会话，返回 (错误信息, 耗时秒)；走到结束画面时错误信息为 None"""
+    global _script
+    _script = session_script(subject_id, investment)
+    del _scenes_seen[:]
+    error = None
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO() if quiet else sys.stdout):
+            engine.main(condition_name)
+    except SystemExit:
+        pass
+    except Exception:
+        error = traceback.format_exc()
+    finally:
+        reset_event_log()  # 失败/卡住的会话可能留下已打开的日志和未写出的记录
+        pygame.quit()
+    seconds = time.perf_counter() - start
+    if error is None and _scenes_seen[-1:] != ["End"]:
+        error = f"卡在场景 {_scenes_seen[-1] if _scenes_seen else '(无)'}"
+    return error, seconds
+
+
+def _read_csv(filename):
+    with open(filename, newline='', encoding='utf-8-sig') as f:
+        return list(csv.DictReader(f))
+
+
+def check_outputs(sessions):
+    """核对数据文件：汇总表有每个会话的记录且投入额与脚本一致，日志和计时汇总齐全"""
+    problems = []
+    try:
+        summary = {row["Subject_ID"]: row for row in _read_csv(engine.DATA_FILENAME)}
+    except OSError as e:
+        return [f"无法读取汇总表: {e}"]
+    versions = latest_versions(engine.SUMMARY_DB_FILENAME)  # 输出目录重复使用时数据文件带 _vN 后缀
+    for condition_name, subject_id, investment in sessions:
+        file_id = session_file_id(subject_id, versions.get(subject_id))
+        row = summary.get(subject_id)
+        if row is None:
+            problems.append(f"{subject_id}: 汇总表中没有记录")
+        elif row["PGG_Investment"] != str(investment):
+            problems.append(f"{subject_id}: 汇总表投入额 {row['PGG_Investment']}，应为 {investment}")
+        stored = find_sessions(engine.SUMMARY_DB_FILENAME, subject_id=subject_id)[-1:]
+        if [row["condition"] for row in stored] != [condition_name]:
+            problems.append(f"{subject_id}: 数据库中的条件因素为 {stored}")
+        log_filename = get_condition(condition_name)["log_filename"].format(subject_id=file_id)
+        try:
+            log_rows = _read_csv(log_filename)
+        except OSError:
+            problems.append(f"{subject_id}: 缺少日志 {log_filename}")
+        else:
+            confirms = [row["Note"] for row in log_rows if row["Scene"] == "PGG_Game" and row["Key"] == "RETURN"]
+            if confirms[-1:] != [f"Confirm: {investment}"]:
+                problems.append(f"{subject_id}: 日志中的 PGG 确认记录为 {confirms}")
+            if not any(row["Scene"] == "Cyberball_Game" and row["Key"] == "END" for row in log_rows):
+                problems.append(f"{subject_id}: 日志中没有 Cyberball 结束记录")
+        if not os.path.isfile(f"timing_quality_{file_id}.csv"):
+            problems.append(f"{subject_id}: 缺少计时汇总")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="无界面批量运行模拟会话")
+    parser.add_argument("conditions", nargs="*", help=f"轮流运行的条件 (默认全部): {', '.join(CONDITIONS)}")
+    parser.add_argument("-n", "--sessions", type=int, default=len(CONDITIONS), help="会话数")
+    parser.add_argument("--out", default="headless_out", help="数据文件输出目录")
+    parser.add_argument("--first-id", type=int, default=1, help="第一个会话的被试编号，之后依次加 1")
+    parser.add_argument("--seed", type=int, default=0, help="生成 PGG 投入额的随机种子")
+    parser.add_argument("--verbose", action="store_true", help="显示实验程序自身的输出")
+    args = parser.parse_args(argv)
+    conditions = args.conditions or list(CONDITIONS)
+    unknown = [name for name in conditions if name not in CONDITIONS]
+    if unknown:
+        parser.error(f"未知条件: {', '.join(unknown)}")
+
+    os.makedirs(args.out, exist_ok=True)
+    os.chdir(args.out)
+    install()
+    rng = random.Random(args.seed)
+    completed = []
+    failures = 0
+    start = time.perf_counter()
+    for i in range(args.sessions):
+        condition_name = conditions[i % len(conditions)]
+        subject_id = str(args.first_id + i)
+        investment = rng.randint(0, get_condition(condition_name)["pgg_endowment"])
+        error, seconds = run_session(condition_name, subject_id, investment, quiet=not args.verbose)
+        if error is None:
+            completed.append((condition_name, subject_id, investment))
+        else:
+            failures += 1
+            print(f"【失败】{condition_name} #{subject_id}: {error}")
+    elapsed = time.perf_counter() - start
+
+    problems = check_outputs(completed)
+    for problem in problems:
+        print(f"【数据】{problem}")
+    print(f">>> {args.sessions} 个会话，失败 {failures} 个，数据问题 {len(problems)} 处，"
+          f"用时 {elapsed:.1f} 秒 ({args.sessions / elapsed * 60:.0f} 个/分钟)")
+    return 1 if failures or problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
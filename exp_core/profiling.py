@@ -0,0 +1,205 @@
+"""
+按场景的性能剖析 (可选)：记录每个场景函数的进入/退出时间、帧数，以及耗时在绘制、
+事件读取、休眠之间的分配，会话结束时写入 session_profile_<ID>.json (重复编号的会话带 _vN 后缀)。
+
+设置环境变量 EXP_PROFILE=1 (或 python -m exp_core.engine <条件> --profile) 开启；
+EXP_PROFILE=cprofile 时还对每个场景运行 cProfile，报告中附上累计耗时最多的函数。
+未开启时不做任何替换，实验流程没有额外开销。
+
+分类口径：
+    render_ms  engine 调用的绘制/提交函数 (静态层、局部刷新、flip、文本排版)
+    event_ms   pygame.event.get / wait (含阅读场景阻塞等待按键的时间)
+    sleep_ms   clock.tick 的帧率等待和 time.sleep (场景中的固定等待)
+    other_ms   其余 (场景逻辑、动态元素绘制、写日志、等待外部 Cyberball 进程等)
+"""
+import cProfile
+import datetime
+import functools
+import json
+import os
+import pstats
+import time
+
+import pygame
+
+PROFILE_ENV = "EXP_PROFILE"
+
+# 报告中每个场景保留的 cProfile 条目数
+PROFILE_TOP = 15
+
+# engine 中计入绘制的函数；其中会提交画面的计为一帧
+RENDER_FUNCTIONS = ("show_static_scene", "present_layer", "restore_rects", "update_rects", "flip_display",
+                    "draw_text_wrapped")
+FRAME_FUNCTIONS = ("show_static_scene", "present_layer", "update_rects", "flip_display")
+
+_installed = False
+_session = None  # 当前会话的报告
+_stack = []  # 正在运行的场景记录 (场景函数可能嵌套调用)
+_busy = False  # 正在计时的分类调用内部不重复计时
+
+
+def enabled():
+    return os.environ.get(PROFILE_ENV, "") not in ("", "0")
+
+
+def cprofile_enabled():
+    return os.environ.get(PROFILE_ENV, "") == "cprofile"
+
+
+def _timed(category, func, frame=False):
+    """包装 func：耗时计入当前场景的 category，frame=True 时每次调用计一帧"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        global _busy
+        if _busy or not _stack:
+            return func(*args, **kwargs)
+        _busy = True
+        start = time.perf_counter_ns()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            record = _stack[-1]
+            record[category] += time.perf_counter_ns() - start
+            if frame:
+                record["frames"] += 1
+            _busy = False
+    return wrapper
+
+
+class _TimedClock:
+    """engine.clock 的代理：tick 的帧率等待计入休眠"""
+
+    def __init__(self, clock):
+        self._clock = clock
+        self.tick = _timed("sleep_ns", clock.tick)
+
+    def __getattr__(self, name):
+        return getattr(self._clock, name)
+
+
+def _profiled_scene(func):
+    """包装场景函数：记录进入/退出时间、帧数和各分类耗时"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        record = {"scene": func.__name__, "enter_ns": time.perf_counter_ns(), "cpu_start_ns": time.process_time_ns(),
+                  "frames": 0, "render_ns": 0, "event_ns": 0, "sleep_ns": 0}
+        profiler = None
+        if cprofile_enabled() and not _stack:
+            profiler = cProfile.Profile()
+        _stack.append(record)
+        if profiler is not None:
+            profiler.enable()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            _stack.pop()
+            _finish_scene(record, profiler)
+    return wrapper
+
+
+def _top_functions(profiler):
+    stats = pstats.Stats(profiler)
+    rows = []
+    for (filename, line, name), (_, calls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({"function": f"{os.path.basename(filename)}:{line}({name})", "calls": calls,
+                     "tottime_ms": round(tottime * 1000, 3), "cumtime_ms": round(cumtime * 1000, 3)})
+    rows.sort(key=lambda row: row["cumtime_ms"], reverse=True)
+    return rows[:PROFILE_TOP]
+
+
+def _finish_scene(record, profiler):
+    exit_ns = time.perf_counter_ns()
+    wall_ns = exit_ns - record["enter_ns"]
+    measured = record["render_ns"] + record["event_ns"] + record["sleep_ns"]
+    row = {
+        "scene": record["scene"],
+        "enter_ns": record["enter_ns"],
+        "exit_ns": exit_ns,
+        "wall_ms": round(wall_ns / 1e6, 3),
+        "cpu_ms": round((time.process_time_ns() - record["cpu_start_ns"]) / 1e6, 3),
+        "frames": record["frames"],
+        "render_ms": round(record["render_ns"] / 1e6, 3),
+        "event_ms": round(record["event_ns"] / 1e6, 3),
+        "sleep_ms": round(record["sleep_ns"] / 1e6, 3),
+        "other_ms": round((wall_ns - measured) / 1e6, 3),
+    }
+    if profiler is not None:
+        row["cprofile"] = _top_functions(profiler)
+    if _session is not None:
+        _session["scenes"].append(row)
+    if _stack:
+        # 嵌套场景的帧数也算在外层场景里
+        _stack[-1]["frames"] += record["frames"]
+
+
+def _profiled_main(main):
+    @functools.wraps(main)
+    def wrapper(condition_name):
+        global _session
+        _session = {"condition": condition_name, "subject_id": None,
+                    "started": datetime.datetime.now().isoformat(timespec="seconds"),
+                    "cprofile": cprofile_enabled(), "scenes": []}
+        start_ns = time.perf_counter_ns()
+        try:
+            return main(condition_name)
+        finally:
+            _session["wall_ms"] = round((time.perf_counter_ns() - start_ns) / 1e6, 3)
+            write_session_profile(_session)
+    return wrapper
+
+
+def _capture_subject_id(get_user_input):
+    @functools.wraps(get_user_input)
+    def wrapper(*args, **kwargs):
+        subject_id = get_user_input(*args, **kwargs)
+        if _session is not None:
+            _session["subject_id"] = subject_id
+        return subject_id
+    return wrapper
+
+
+def set_file_id(file_id):
+    """记下本次会话数据文件名中的编号 (含 _vN 后缀)，报告文件与其他数据文件同名"""
+    if _session is not None:
+        _session["file_id"] = file_id
+
+
+def _timed_init_display(init_display, engine):
+    @functools.wraps(init_display)
+    def wrapper(*args, **kwargs):
+        init_display(*args, **kwargs)
+        engine.clock = _TimedClock(engine.clock)
+    return wrapper
+
+
+def write_session_profile(session):
+    """把会话报告写入 session_profile_<ID>.json"""
+    filename = f"session_profile_{session.get('file_id') or session['subject_id'] or 'unknown'}.json"
+    try:
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(session, f, ensure_ascii=False, indent=2)
+        print(f">>> 场景剖析报告已保存: {os.path.abspath(filename)}")
+    except OSError as e:
+        print(f"保存剖析报告失败: {e}")
+
+
+def install(engine):
+    """替换 engine 中的场景函数和绘制/事件/休眠调用，开始按场景计时 (只需调用一次)"""
+    global _installed
+    if _installed:
+        return
+    _installed = True
+    for name, value in list(vars(engine).items()):
+        if callable(value) and (name.startswith("scene_") or name in ("get_user_input",
+                                                                       "launch_cyberball_process_blocking")):
+            setattr(engine, name, _profiled_scene(value))
+    engine.get_user_input = _capture_subject_id(engine.get_user_input)
+    for name in RENDER_FUNCTIONS:
+        setattr(engine, name, _timed("render_ns", getattr(engine, name), frame=name in FRAME_FUNCTIONS))
+    engine.init_display = _timed_init_display(engine.init_display, engine)
+    engine.main = _profiled_main(engine.main)
+    pygame.event.get = _timed("event_ns", pygame.event.get)
+    pygame.event.wait = _timed("event_ns", pygame.event.wait)
+    time.sleep = _timed("sleep_ns", time.sleep)
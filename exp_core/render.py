@@ -0,0 +1,53 @@
+"""
+静态画面缓存与局部刷新。
+
+指导语类场景在显示期间内容不变：首次进入时把静态内容合成到离屏 Surface，
+整屏 blit + flip 一次，之后不再逐帧重绘。含动态元素的场景 (输入框、进度条)
+先用静态层覆盖变化区域，再只重绘这些区域并通过 display.update(rects) 提交。
+"""
+import pygame
+
+from exp_core import timing
+
+_static_layers = {}  # key -> 合成好的静态画面 Surface
+
+
+def static_layer(key, size, draw):
+    """返回缓存的静态画面层，首次使用时调用 draw(surface) 合成"""
+    layer = _static_layers.get(key)
+    if layer is None:
+        layer = pygame.Surface(size)
+        if pygame.display.get_surface() is not None:
+            layer = layer.convert()
+        draw(layer)
+        _static_layers[key] = layer
+    return layer
+
+
+def show_static_scene(screen, key, draw):
+    """整屏显示静态画面层 (进入场景时调用一次)，返回该层供局部恢复使用"""
+    layer = static_layer(key, screen.get_size(), draw)
+    present_layer(screen, layer)
+    return layer
+
+
+def present_layer(screen, layer):
+    """整屏 blit 静态层并 flip (窗口重新显示时也用它重绘)"""
+    screen.blit(layer, (0, 0))
+    timing.flip_display()
+
+
+def restore_rects(screen, layer, rects):
+    """用静态层覆盖给定区域，擦除上一帧的动态内容"""
+    for rect in rects:
+        screen.blit(layer, rect, rect)
+
+
+def update_rects(rects):
+    """只把变化的区域提交到屏幕"""
+    timing.update_display(rects)
+
+
+def clear_static_layers():
+    """pygame.quit() 之后缓存的 Surface 失效，需要清空"""
+    _static_layers.clear()
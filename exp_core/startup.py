@@ -0,0 +1,54 @@
+"""
+启动耗时报告：从 engine 开始导入到第一帧画面 (ID 输入框) 显示，按阶段记录耗时。
+
+设置环境变量 EXP_STARTUP_REPORT=1 (或 python -m exp_core.engine <条件> --startup-report)
+后在第一帧显示时打印，格式仿照 python -X importtime；模块级的导入细节仍可用
+python -X importtime 查看。解释器自身的启动时间不在统计范围内。
+"""
+import os
+import sys
+import time
+
+REPORT_ENV = "EXP_STARTUP_REPORT"
+
+# 只应在外部 Cyberball 流程中才加载的模块，第一帧时若已加载说明被提前导入了
+LAZY_MODULES = ("pyautogui", "PIL")
+
+_t0_ns = time.perf_counter_ns()  # 本模块被导入的时间 (engine 第一个导入的模块)
+_marks = []  # [(阶段, 完成时间 ns)]
+_finished = False
+
+
+def enabled():
+    return os.environ.get(REPORT_ENV, "") not in ("", "0")
+
+
+def mark(label):
+    """记录一个阶段的完成时间 (第一帧之后的调用被忽略)"""
+    if not _finished:
+        _marks.append((label, time.perf_counter_ns()))
+
+
+def startup_report():
+    """各阶段的 (阶段, 本阶段毫秒, 累计毫秒)"""
+    rows = []
+    prev = _t0_ns
+    for label, t in _marks:
+        rows.append((label, (t - prev) / 1e6, (t - _t0_ns) / 1e6))
+        prev = t
+    return rows
+
+
+def first_frame():
+    """第一帧已显示：结束计时，开启报告时打印"""
+    global _finished
+    if _finished:
+        return
+    mark("first frame")
+    _finished = True
+    if enabled():
+        print("startup: phase [ms] | cumulative [ms] | stage", file=sys.stderr)
+        for label, phase_ms, total_ms in startup_report():
+            print(f"startup: {phase_ms:10.1f} | {total_ms:15.1f} | {label}", file=sys.stderr)
+        loaded = [name for name in LAZY_MODULES if name in sys.modules]
+        print(f"startup: lazy modules already loaded: {', '.join(loaded) or 'none'}", file=sys.stderr)
@@ -0,0 +1,358 @@
+"""
+汇总数据存储：每个会话结束时的一行汇总写入 SQLite 数据库 (Subject_ID 建索引)，
+并在同一个写事务内追加到 experiment_data.csv，多台电脑同时保存时不会交错或重复。
+
+数据库的写锁 (BEGIN IMMEDIATE) 同时保护 CSV：表头检查和追加都在持锁期间完成；
+数据库提交失败时把 CSV 截回追加前的长度，两边保持一致。同一会话 (session_id)
+重复提交时数据库拒绝插入，CSV 也不再追加。
+
+数据库中每个条件因素 (FACTOR_COLUMNS，以及 total_endowment) 单独成列并建索引，
+按因素分组筛选时不用再拆 Condition_Group 字符串：
+
+    find_sessions("experiment_data.sqlite", cyberball="exclusion", posture="defensive")
+
+旧版数据库在第一次打开时补上这些列，已有的行由 Condition_Group 回填 (script_version 留空)。
+
+journal_mode 默认 DELETE (回滚日志 + 文件锁)，可用于网络共享目录；
+WAL 依赖同一台机器上的共享内存，只在数据文件位于本机磁盘时使用。
+
+同一数据库中的 subject_sessions 表是被试编号登记表：输入编号时按主键查询该编号
+是否已有会话，重复时拒绝或登记为新版本 (_v2、_v3 ... 的数据文件，不覆盖旧文件)。
+登记表可由现有数据文件一次扫描重建：
+
+    python -m exp_core.summary_store rebuild-ids --dir 数据目录
+
+数据库无法打开或加锁超时时，实验程序改为直接追加 CSV (append_csv)。汇总表中数据库里
+还没有的行 (改用数据库之前保存的会话，或上述后备写入的行) 可一次补入 sessions 表：
+
+    python -m exp_core.summary_store import-csv --dir 数据目录
+"""
+import argparse
+import csv
+import datetime
+import io
+import os
+import re
+import sqlite3
+import uuid
+
+SUMMARY_FIELDNAMES = ['Subject_ID', 'Condition_Group', 'Timestamp', 'PGG_Investment', 'Total_Endowment',
+                      'Cyberball_Mode']
+
+# 等待其他电脑释放写锁的最长时间 (秒)
+LOCK_TIMEOUT = 30
+
+# 条件因素列 (列名 -> 类型)，每列建索引
+FACTOR_COLUMNS = {
+    "condition": "TEXT",
+    "cyberball": "TEXT",
+    "attribution": "TEXT",
+    "posture": "TEXT",
+    "necessity": "TEXT",
+    "cyberball_mode": "TEXT",
+    "pgg_threshold": "INTEGER",
+    "pgg_multiplier": "INTEGER",
+    "script_version": "TEXT",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    subject_id TEXT NOT NULL,
+    condition_group TEXT,
+    timestamp TEXT,
+    pgg_investment INTEGER,
+    total_endowment INTEGER,
+    station TEXT
+);
+CREATE INDEX IF NOT EXISTS sessions_subject_id ON sessions (subject_id);
+CREATE TABLE IF NOT EXISTS subject_sessions (
+    subject_id TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    session_id TEXT,
+    registered_at TEXT,
+    station TEXT,
+    PRIMARY KEY (subject_id, version)
+);
+"""
+
+
+def connect(db_filename, journal_mode="DELETE"):
+    """打开 (必要时创建) 汇总数据库；isolation_level=None 以便显式控制事务"""
+    conn = sqlite3.connect(db_filename, timeout=LOCK_TIMEOUT, isolation_level=None)
+    conn.execute(f"PRAGMA journal_mode={journal_mode}")
+    conn.executescript(_SCHEMA)
+    _add_factor_columns(conn)
+    return conn
+
+
+def _table_columns(conn):
+    return {row[1] for row in conn.execute("PRAGMA table_info(sessions)")}
+
+
+def _add_factor_columns(conn):
+    """补上缺少的条件因素列和索引 (新建和旧版数据库都走这里)，并回填已有的行"""
+    if _table_columns(conn) >= set(FACTOR_COLUMNS):
+        return
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        columns = _table_columns(conn)  # 取得写锁后再查一次，其他电脑可能刚补过
+        for name, sql_type in FACTOR_COLUMNS.items():
+            if name not in columns:
+                conn.execute(f"ALTER TABLE sessions ADD COLUMN {name} {sql_type}")
+        for name in list(FACTOR_COLUMNS) + ["total_endowment"]:
+            conn.execute(f"CREATE INDEX IF NOT EXISTS sessions_{name} ON sessions ({name})")
+        _backfill_factors(conn)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+
+def _record_factors(record):
+    """由 Condition_Group 字符串解析出的条件因素，无法识别时为空"""
+    from exp_core.conditions import get_condition, condition_factors, parse_condition_record
+
+    name, posture = parse_condition_record(record)
+    return condition_factors(get_condition(name), posture) if name else {}
+
+
+def _backfill_factors(conn):
+    rows = conn.execute("SELECT session_id, condition_group FROM sessions WHERE condition IS NULL").fetchall()
+    for session_id, record in rows:
+        factors = _record_factors(record)
+        if not factors:
+            continue
+        conn.execute(f"UPDATE sessions SET {', '.join(f'{column} = ?' for column in factors)} WHERE session_id = ?",
+                     [*factors.values(), session_id])
+
+
+def _csv_line(row, fieldnames):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow([row.get(name, "") for name in fieldnames])
+    return buffer.getvalue()
+
+
+def _csv_header(csv_filename):
+    """已有汇总表的列 (旧版表头少了后来新增的列，按原表头写入，新增的列只写入数据库)"""
+    with open(csv_filename, newline='', encoding='utf-8-sig') as f:
+        return next(csv.reader(f), SUMMARY_FIELDNAMES)
+
+
+def _append_csv_row(csv_filename, row, size):
+    """追加一行汇总 (size 为追加前的文件长度，为 0 时先写表头)"""
+    fieldnames = _csv_header(csv_filename) if size else SUMMARY_FIELDNAMES
+    with open(csv_filename, mode='a', newline='', encoding='utf-8-sig') as f:
+        if size == 0:
+            csv.writer(f).writerow(SUMMARY_FIELDNAMES)
+        f.write(_csv_line(row, fieldnames))  # 一次写入整行
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def append_csv(csv_filename, row):
+    """不经数据库直接追加一行汇总 (数据库不可用时的后备；没有跨电脑的锁，之后用 import_csv 补入数据库)"""
+    _append_csv_row(csv_filename, row, os.path.getsize(csv_filename) if os.path.isfile(csv_filename) else 0)
+
+
+def _insert_session(conn, session_id, row, station, factors):
+    values = {"session_id": session_id, "subject_id": row['Subject_ID'], "condition_group": row['Condition_Group'],
+              "timestamp": row['Timestamp'], "pgg_investment": row['PGG_Investment'],
+              "total_endowment": row['Total_Endowment'], "station": station}
+    values.update((name, value) for name, value in (factors or {}).items() if name in FACTOR_COLUMNS)
+    conn.execute(f"INSERT INTO sessions ({', '.join(values)}) VALUES ({', '.join('?' * len(values))})",
+                 list(values.values()))
+
+
+def commit_session(db_filename, csv_filename, session_id, row, station="", journal_mode="DELETE", factors=None):
+    """
+    原子地保存一个会话的汇总 (row 的键为 SUMMARY_FIELDNAMES，factors 的键为 FACTOR_COLUMNS，只写入数据库)。
+    返回 True；该会话已保存过时返回 False (不重复写入)。
+    """
+    conn = connect(db_filename, journal_mode)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            _insert_session(conn, session_id, row, station, factors)
+        except sqlite3.IntegrityError:
+            conn.rollback()
+            return False
+
+        size = os.path.getsize(csv_filename) if os.path.isfile(csv_filename) else 0
+        try:
+            _append_csv_row(csv_filename, row, size)
+            conn.commit()
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            if os.path.isfile(csv_filename) and os.path.getsize(csv_filename) > size:
+                with open(csv_filename, mode='r+b') as f:
+                    f.truncate(size)
+            raise
+        return True
+    finally:
+        conn.close()
+
+
+def _int_or_none(text):
+    try:
+        return int(text)
+    except (TypeError, ValueError):
+        return None
+
+
+def import_csv(db_filename, csv_filename, journal_mode="DELETE"):
+    """
+    把汇总表中数据库里还没有的行补入 sessions 表，条件因素由 Condition_Group 解析。
+    按 (编号, 时间, 条件) 的出现次数比较，可重复运行。返回补入的行数
+    """
+    if not os.path.isfile(csv_filename):
+        return 0
+    conn = connect(db_filename, journal_mode)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        stored = {}
+        for key in conn.execute("SELECT subject_id, timestamp, condition_group FROM sessions"):
+            stored[key] = stored.get(key, 0) + 1
+        imported = 0
+        with open(csv_filename, newline='', encoding='utf-8-sig') as f:
+            for row in csv.DictReader(f):
+                key = (row['Subject_ID'], row['Timestamp'], row['Condition_Group'])
+                if stored.get(key):
+                    stored[key] -= 1
+                    continue
+                row = dict(row, PGG_Investment=_int_or_none(row['PGG_Investment']),
+                           Total_Endowment=_int_or_none(row['Total_Endowment']))
+                factors = dict(_record_factors(row['Condition_Group']), cyberball_mode=row.get('Cyberball_Mode') or None)
+                _insert_session(conn, uuid.uuid4().hex, row, "import-csv", factors)
+                imported += 1
+        conn.commit()
+        return imported
+    except BaseException:
+        if conn.in_transaction:
+            conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def find_sessions(db_filename, journal_mode="DELETE", **where):
+    """
+    按列筛选会话 (条件因素列和 subject_id 都有索引)，返回按保存顺序排列的行 (dict)；
+    值为 None 时匹配空值，如 find_sessions(db, necessity="high", pgg_threshold=None)
+    """
+    conn = connect(db_filename, journal_mode)
+    try:
+        unknown = set(where) - _table_columns(conn)
+        if unknown:
+            raise ValueError(f"sessions 表中没有这些列: {', '.join(sorted(unknown))}")
+        conn.row_factory = sqlite3.Row
+        sql = "SELECT * FROM sessions"
+        if where:
+            sql += " WHERE " + " AND ".join(f"{name} IS ?" for name in where)
+        return [dict(row) for row in conn.execute(sql + " ORDER BY rowid", list(where.values()))]
+    finally:
+        conn.close()
+
+
+def register_session(db_filename, subject_id, session_id, station="", allow_duplicate=True, journal_mode="DELETE"):
+    """
+    输入编号时登记一个会话，返回该编号的会话版本号 (第一次为 1)；
+    编号已有会话且 allow_duplicate=False 时不登记，返回 None
+    """
+    conn = connect(db_filename, journal_mode)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        latest = conn.execute("SELECT MAX(version) FROM subject_sessions WHERE subject_id = ?",
+                              (subject_id,)).fetchone()[0]
+        if latest is not None and not allow_duplicate:
+            conn.rollback()
+            return None
+        version = (latest or 0) + 1
+        conn.execute("INSERT INTO subject_sessions VALUES (?, ?, ?, ?, ?)",
+                     (subject_id, version, session_id, datetime.datetime.now().isoformat(timespec="seconds"),
+                      station))
+        conn.commit()
+        return version
+    finally:
+        conn.close()
+
+
+def latest_versions(db_filename, journal_mode="DELETE"):
+    """登记表中各编号的最新会话版本号"""
+    conn = connect(db_filename, journal_mode)
+    try:
+        return dict(conn.execute("SELECT subject_id, MAX(version) FROM subject_sessions GROUP BY subject_id"))
+    finally:
+        conn.close()
+
+
+def session_file_id(subject_id, version):
+    """数据文件名中的编号：第一个会话不加后缀，之后为 <编号>_v<版本号>"""
+    return subject_id if not version or version == 1 else f"{subject_id}_v{version}"
+
+
+def log_file_patterns(templates):
+    """由日志文件名模板 (如 key_logs_{subject_id}.csv) 生成匹配各版本日志文件的正则"""
+    return [re.compile(re.escape(template).replace(re.escape("{subject_id}"), r"(?P<id>[^\W_]+)(?:_v(?P<v>\d+))?"))
+            for template in templates]
+
+
+def rebuild_registry(db_filename, csv_filename, log_dir, log_templates, journal_mode="DELETE"):
+    """
+    由现有数据文件重建登记表 (一次扫描，不整体读入内存)：每个编号的会话数取汇总表中的行数
+    与该编号日志文件的版本数中较大者 (中途退出的会话只有日志)。返回各编号的会话数
+    """
+    counts = {}
+    patterns = log_file_patterns(log_templates)
+    with os.scandir(log_dir) as entries:
+        for entry in entries:
+            for pattern in patterns:
+                match = pattern.fullmatch(entry.name)
+                if match:
+                    subject_id = match["id"]
+                    counts[subject_id] = max(counts.get(subject_id, 0) + 1, int(match["v"] or 1))
+                    break
+    rows = {}
+    if os.path.isfile(csv_filename):
+        with open(csv_filename, newline='', encoding='utf-8-sig') as f:
+            for row in csv.DictReader(f):
+                rows[row['Subject_ID']] = rows.get(row['Subject_ID'], 0) + 1
+    for subject_id, count in rows.items():
+        counts[subject_id] = max(counts.get(subject_id, 0), count)
+
+    conn = connect(db_filename, journal_mode)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM subject_sessions")
+        now = datetime.datetime.now().isoformat(timespec="seconds")
+        conn.executemany("INSERT INTO subject_sessions VALUES (?, ?, NULL, ?, 'rebuild')",
+                         ((subject_id, version, now) for subject_id, count in counts.items()
+                          for version in range(1, count + 1)))
+        conn.commit()
+    finally:
+        conn.close()
+    return counts
+
+
+def main(argv=None):
+    from exp_core.conditions import log_filename_templates
+
+    parser = argparse.ArgumentParser(description="汇总数据库维护")
+    parser.add_argument("command", choices=["rebuild-ids", "import-csv"],
+                        help="rebuild-ids: 由现有数据文件重建被试编号登记表；import-csv: 把汇总表中数据库里没有的行补入数据库")
+    parser.add_argument("--dir", default=".", help="数据目录")
+    parser.add_argument("--db", default="experiment_data.sqlite", help="汇总数据库文件名")
+    parser.add_argument("--csv", default="experiment_data.csv", help="汇总表文件名")
+    args = parser.parse_args(argv)
+    if args.command == "import-csv":
+        imported = import_csv(os.path.join(args.dir, args.db), os.path.join(args.dir, args.csv))
+        print(f">>> 已补入 {imported} 行汇总数据")
+        return
+    counts = rebuild_registry(os.path.join(args.dir, args.db), os.path.join(args.dir, args.csv), args.dir,
+                              log_filename_templates())
+    print(f">>> 登记表已重建: {len(counts)} 个编号，{sum(counts.values())} 个会话")
+
+
+if __name__ == "__main__":
+    main()
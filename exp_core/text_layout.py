@@ -0,0 +1,157 @@
+"""
+文本排版缓存：draw_text_wrapped 的断行结果和每行渲染好的 Surface 按
+(文本, 字体, 颜色, 区域宽度, 行距) 缓存，静态指导语画面每帧只需几次 blit。
+
+断行默认使用字宽表模式 ("table")：每个字体/字号维护一张字符前进宽度表，
+用前缀和 + 二分查找定位断点，每行只需 1~2 次 font.size() 校验，
+并遵循中英文断行规则 (英文单词/数字不拆开，标点不出现在行首等)。
+旧的逐字测量模式 ("char") 保留，用于复现旧版排版。
+"""
+from bisect import bisect_left
+from collections import OrderedDict
+from itertools import accumulate
+
+# 最多缓存的排版数量 (超出后淘汰最久未使用的)
+LAYOUT_CACHE_SIZE = 256
+
+# 默认断行模式: "table" (字宽表) 或 "char" (旧版逐字测量)
+DEFAULT_WRAP_MODE = "table"
+
+# 不能出现在行首的标点
+NO_LINE_START = set("，。、；：？！）》」』】〕〉”’…—·,.;:?!)]}%")
+# 不能出现在行尾的标点
+NO_LINE_END = set("（《「『【〔〈“‘([{")
+
+_layout_cache = OrderedDict()  # key -> (各行 [(Surface, 相对 y)], 总高度)
+_advance_tables = {}  # 字体 -> {字符: 前进宽度}
+_stats = {"hits": 0, "misses": 0}
+
+
+def _is_word_char(char):
+    """英文字母/数字，连续时视为一个不可拆分的单词"""
+    return char.isascii() and (char.isalnum() or char in "_-'")
+
+
+def advance_table(font, chars=""):
+    """返回字体的字宽表，缺失的字符用一次 font.metrics() 批量补齐"""
+    table = _advance_tables.setdefault(font, {})
+    missing = [c for c in set(chars) if c not in table]
+    if missing:
+        for char, metrics in zip(missing, font.metrics("".join(missing))):
+            table[char] = metrics[4] if metrics else font.size(char)[0]
+    return table
+
+
+def _breaks_rule(paragraph, start, index):
+    """在 index 处断行是否违反行首/行尾禁则 (断点两侧的空格在排版时去掉，按去掉后的首尾字符判断)"""
+    head = index
+    while head < len(paragraph) and paragraph[head] == " ":
+        head += 1
+    tail = index
+    while tail > start and paragraph[tail - 1] == " ":
+        tail -= 1
+    return ((head < len(paragraph) and paragraph[head] in NO_LINE_START)
+            or (tail > start and paragraph[tail - 1] in NO_LINE_END))
+
+
+def _adjust_break(paragraph, start, end):
+    """按中英文断行规则把断点向前调整，无法调整时保持原断点"""
+    candidate = end
+    # 不拆分英文单词/数字
+    if _is_word_char(paragraph[candidate - 1]) and _is_word_char(paragraph[candidate]):
+        while candidate > start and _is_word_char(paragraph[candidate - 1]):
+            candidate -= 1
+    # 行首禁则 / 行尾禁则
+    while candidate > start + 1 and _breaks_rule(paragraph, start, candidate):
+        candidate -= 1
+    return candidate if candidate > start else end
+
+
+def _wrap_paragraph_table(paragraph, font, width):
+    table = advance_table(font, paragraph)
+    prefix = list(accumulate((table[c] for c in paragraph), initial=0))
+    n = len(paragraph)
+    lines = []
+    start = 0
+    while start < n:
+        # 字宽和 < width 的最长前缀
+        end = max(start + 1, bisect_left(prefix, prefix[start] + width, lo=start + 1) - 1)
+        # 用真实测量校正字距误差
+        while end > start + 1 and font.size(paragraph[start:end])[0] >= width:
+            end -= 1
+        while end < n and font.size(paragraph[start:end + 1])[0] < width:
+            end += 1
+        if end < n:
+            end = _adjust_break(paragraph, start, end)
+        lines.append(paragraph[start:end].rstrip(" "))
+        start = end
+        while start < n and paragraph[start] == " ":
+            start += 1
+    return lines
+
+
+def _wrap_paragraph_char(paragraph, font, width):
+    lines = []
+    current_line = ""
+    for char in paragraph:
+        test_line = current_line + char
+        fw, fh = font.size(test_line)
+        if fw < width:
+            current_line = test_line
+        else:
+            lines.append(current_line)
+            current_line = char
+    if current_line:
+        lines.append(current_line)
+    return lines
+
+
+def wrap_lines(text, font, width, mode=DEFAULT_WRAP_MODE):
+    """按区域宽度断行，返回行文本列表 (空段落不占行)"""
+    wrap_paragraph = _wrap_paragraph_char if mode == "char" else _wrap_paragraph_table
+    lines = []
+    for paragraph in text.split('\n'):
+        if paragraph:
+            lines.extend(wrap_paragraph(paragraph, font, width))
+    return lines
+
+
+def layout_text(text, color, width, font, line_spacing=12, wrap_mode=DEFAULT_WRAP_MODE):
+    """返回 (各行 [(Surface, 相对 y)], 总高度)，命中缓存时不再测量和渲染"""
+    key = (text, font, tuple(color), width, line_spacing, wrap_mode)
+    layout = _layout_cache.get(key)
+    if layout is not None:
+        _stats["hits"] += 1
+        _layout_cache.move_to_end(key)
+        return layout
+    _stats["misses"] += 1
+    step = font.get_height() + line_spacing
+    rendered = []
+    y = 0
+    for line in wrap_lines(text, font, width, wrap_mode):
+        rendered.append((font.render(line, True, color), y))
+        y += step
+    layout = (rendered, y)
+    _layout_cache[key] = layout
+    if len(_layout_cache) > LAYOUT_CACHE_SIZE:
+        _layout_cache.popitem(last=False)
+    return layout
+
+
+def draw_text_wrapped(surface, text, color, rect, font, line_spacing=12, wrap_mode=DEFAULT_WRAP_MODE):
+    """在 rect 内自动换行绘制文本，返回下一行的 y 坐标"""
+    rendered, height = layout_text(text, color, rect.width, font, line_spacing, wrap_mode)
+    for line_surf, dy in rendered:
+        surface.blit(line_surf, (rect.left, rect.top + dy))
+    return rect.top + height
+
+
+def clear_layout_cache():
+    """pygame.quit() 之后缓存的 Surface 失效，需要清空"""
+    _layout_cache.clear()
+    _advance_tables.clear()
+
+
+def layout_cache_stats():
+    """返回排版缓存命中/未命中次数"""
+    return {"hits": _stats["hits"], "misses": _stats["misses"], "layouts": len(_layout_cache)}
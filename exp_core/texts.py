@@ -0,0 +1,177 @@
+"""
+实验文案，按文案编号索引。各条件在 conditions.py 中引用自己用到的编号，
+启动时只取出并填充当前条件的那几段 (各条件文案按原脚本逐字保留)。
+
+占位符 {endowment} {multiplier} {threshold} 由条件参数填充，
+{subject_id} {condition_id} 在场景中填充。
+"""
+
+TEXTS = {
+    # ================= 姿势指导语 =================
+    "posture_defensive": "为了标准化实验的生理背景，请在接下来的任务中\n全程保持以下坐姿：\n\n1. 请将 [双臂紧紧交叉] 抱在胸前。\n\n2. 请将 [双腿交叉]（如翘二郎腿或脚踝交叉）。\n\n3. 让身体 [微微前倾并轻微蜷缩]，保持肩膀内收。\n\n请确保在接下来的互动游戏中，始终保持这个姿势，\n直到游戏结束。",
+    "posture_neutral": "为了标准化实验的生理背景，请在接下来的任务中\n全程保持以下坐姿：\n\n1. 请以舒适姿势坐好，[背部挺直] 靠在椅背上。\n\n2. 请将 [双手自然平放] 在大腿上。\n\n3. 请将 [双脚平放] 在地面上，不要交叉。\n\n请确保在接下来的互动游戏中，始终保持这个姿势，\n直到游戏结束。",
+    # 只有两条要求的中性姿势 (原 Exc_Ext_Low)
+    "posture_neutral_short": "为了标准化实验的生理背景，请在接下来的任务中\n全程保持以下坐姿：\n\n1. 请以舒适姿势坐好，[背部挺直] 靠在椅背上。 \n\n2. 请将 [双脚平放] 在地面上，不要交叉。\n\n请确保在接下来的互动游戏中，始终保持这个姿势，\n直到游戏结束。",
+
+    # ================= 传球游戏指导语 =================
+    "cyberball_instruction": """【任务一：网络传球游戏】
+
+接下来，您将参与一个在线互动的传球游戏。
+系统将为您随机匹配两名互联网上的其他玩家。
+
+【重要提示】
+1. 本游戏需要连接外部服务器，受网络波动影响，连接可能需要几十秒。
+2. 连接成功后，请与其他玩家进行互动，点击玩家即为传球，您的投掷数据将被记录。
+
+准备好后，按 [空格键] 开始连接服务器。""",
+
+    # 增加了“连接超时”说明
+    "cyberball_instruction_retry": """【任务一：网络传球游戏】
+
+接下来，您将参与一个在线互动的传球游戏。
+系统将为您随机匹配两名互联网上的其他玩家。
+
+【重要提示】
+1. 本游戏需要连接外部服务器，受网络波动影响，连接可能需要几十秒。
+2. 如果出现“连接超时”或“匹配失败”，请不要关闭程序，系统会自动尝试重新刷新连接。
+3. 连接成功后，请与其他玩家进行互动，点击玩家即为传球，您的投掷数据将被记录。
+
+准备好后，按 [空格键] 开始连接服务器。""",
+
+    "cyberball_instruction_retry_thankyou": """【任务一：网络传球游戏】
+
+接下来，您将参与一个在线互动的传球游戏。
+系统将为您随机匹配两名互联网上的其他玩家。
+
+【重要提示】
+1. 本游戏需要连接外部服务器，受网络波动影响，连接可能需要几十秒。
+2. 如果出现“连接超时”或“匹配失败”，请不要关闭程序，系统会自动尝试重新刷新连接。
+3. 连接成功后，请与其他玩家进行互动，点击玩家即为传球，您的投掷数据将被记录，结束后游戏结束显示thankyou关闭弹出窗口即可返回当前窗口即可。
+
+准备好后，按 [空格键] 开始连接服务器。""",
+
+    "cyberball_instruction_retry_thankyou_continue": """【任务一：网络传球游戏】
+
+接下来，您将参与一个在线互动的传球游戏。
+系统将为您随机匹配两名互联网上的其他玩家。
+
+【重要提示】
+1. 本游戏需要连接外部服务器，受网络波动影响，连接可能需要几十秒。
+2. 如果出现“连接超时”或“匹配失败”，请不要关闭程序，系统会自动尝试重新刷新连接。
+3. 连接成功后，请与其他玩家进行互动，点击玩家即为传球，您的投掷数据将被记录，结束后看到thankyou即可关闭弹出窗口继续完成当前窗口任务。
+
+准备好后，按 [空格键] 开始连接服务器。""",
+
+    # ================= 匹配动画 =================
+    "matching_short": ["正在连接服务器...", "已连接到节点 CN-East...", "正在搜索玩家...", "匹配成功！建立连接中..."],
+    "matching_long": ["正在连接服务器...", "已连接到节点 CN-East...", "正在搜索玩家...",
+                      "找到玩家 Player_A (IP: 192.168.x.x)...", "找到玩家 Player_B (IP: 10.0.x.x)...",
+                      "匹配成功！建立连接中..."],
+
+    # ================= 启动 Cyberball 前的提示 =================
+    "ready_exc_ext_high": "网络连接与匹配已完成！\n\n【重要】请保持当前的坐姿。\n\n在稍后弹出的游戏窗口设置您的 ID ({subject_id}) 和条件 ({condition_id})。\n\n在游戏结束后，关闭弹出窗口以继续。\n\n请按 [空格键] 调出游戏窗口，开始传球任务。",
+    "ready_exc_ext_low": "网络连接与匹配已完成！\n\n【重要】请保持当前的坐姿。\n\n稍后弹出的游戏窗口中输入您的participant ID ：{subject_id} 和condition ： {condition_id}。\n\n在游戏结束时关闭弹出窗口。  1601    1\n\n请按 [空格键] 调出游戏窗口，开始传球任务。",
+    "ready_exc_int_high": "网络连接与匹配已完成！\n\n【重要】请保持当前的坐姿。\n\n请在稍后弹出的游戏窗口中手动设置您的 ID ({subject_id}) 和条件 ({condition_id})。\n\n在游戏结束时显示thank 2601  1you时关闭弹出窗口以继续\n\n请按 [空格键] 调出游戏窗口，开始传球任务。",
+    "ready_inc_ext_low": "网络连接与匹配已完成！\n\n【重要】请保持当前的坐姿。\n\n稍后弹出的游戏窗口手动设置您的 ID ({subject_id}) 和condition ({condition_id})。\n\n游戏结束后关闭游戏窗口以继续。1800 2\n\n请按 [空格键] 调出游戏窗口，开始传球任务。",
+    # 不关闭窗口、直接启动 Cyberball 时的提示
+    "call_cyberball_inline": "网络连接成功。即将启动交互界面。\n\n为了确保数据匹配，请在弹出的窗口中确认：\nParticipant ID 填入：{subject_id}\nCondition 填入：{condition_id}\n\n确认无误后点击 [PLAY] 开始任务。",
+
+    # ================= 归因反馈 =================
+    # 【排斥 + 外部归因】
+    "feedback_exc_ext": """【系统分析报告】
+
+玩家ID：P-2025-EXP-09
+任务表现分析：
+后台数据显示您获得的传球次数【显著低于】随机概率水平。
+
+原因诊断：外部因素（系统故障/网络波动）
+经系统排查，发现实验期间您的客户端存在多次连接延迟和微小的丢包现象。这并非您个人行为风格导致，而是由于实验服务器在该时间段内网络负载过高，随机导致了您与另外两名玩家之间的数据传输出现频道路由问题，从而使得您的互动体验受到了严重限制。""",
+
+    # 【排斥 + 内部归因】
+    "feedback_exc_int": """【系统分析报告】
+
+玩家ID：P-2025-EXP-09
+任务表现分析：
+后台数据显示您获得的传球次数【显著低于】随机概率水平。
+
+原因诊断：内部因素（个人特质）
+基于对您在任务中的反应时、交互节奏以及鼠标轨迹的算法分析，系统判定您的互动风格与另外两名玩家存在较低的匹配度。
+这种不匹配导致其他玩家在潜意识中主动选择忽略您。这通常反映了您的某些性格特征在初次社交中较难被他人接纳。""",
+
+    # 【排斥 + 内部归因】(“显著低于”不加粗括号)
+    "feedback_exc_int_plain": """【系统分析报告】
+
+玩家ID：P-2025-EXP-09
+任务表现分析：
+后台数据显示您获得的传球次数显著低于随机概率水平。
+
+原因诊断：内部因素（个人特质）
+基于对您在任务中的反应时、交互节奏以及鼠标轨迹的算法分析，系统判定您的互动风格与另外两名玩家存在较低的匹配度。
+这种不匹配导致其他玩家在潜意识中主动选择忽略您。这通常反映了您的某些性格特征在初次社交中较难被他人接纳。""",
+
+    # 【接纳 + 外部归因】强调系统稳定导致了正常的互动
+    "feedback_inc_ext": """【系统分析报告】
+
+玩家ID：P-2025-EXP-09
+任务表现分析：
+后台数据显示您获得的传球次数处于【正常/活跃】水平，符合随机概率分布。
+
+原因诊断：外部因素（系统连接稳定）
+经系统日志分析，实验期间服务器负载处于最佳状态，您与另外两名玩家之间的网络延迟（Ping值）极低且无丢包现象。这种顺畅的【外部网络环境】确保了数据包的实时传输，使得三人之间的互动请求能够被准确识别和响应，未受到任何技术干扰。""",
+
+    # 【接纳 + 内部归因】
+    "feedback_inc_int": """【系统分析报告】
+
+玩家ID：P-2025-EXP-09
+任务表现分析：
+后台数据显示您获得的传球次数处于【正常水平】，符合甚至略高于随机概率分布。
+
+原因诊断：互动匹配度高（被接纳）
+基于对您在任务中的反应时、交互节奏以及鼠标轨迹的算法分析，系统判定您的互动风格与另外两名玩家存在较高的匹配度。
+这种默契使得其他玩家在潜意识中愿意持续向您传球并保持互动。这通常反映了您的性格特征在初次社交中容易被他人接纳和喜爱。""",
+
+    # ================= 公共物品博弈 =================
+    "pgg_instruction": """【任务二：公共投资决策】
+
+接下来，您将进入第二个任务。
+请注意：您将继续与【刚才传球任务中的另外两名玩家】共同完成此游戏。
+
+规则如下：
+1. 系统给每人发放 {endowment} 个代币作为初始资金。
+2. 您可以选择投入 0 到 {endowment} 个代币到“公共池”中，剩余的留给自己。
+3. 公共池中的总金额将【翻 {multiplier} 倍】，然后平分给三人。
+4. 您的最终收益 = 您保留的金额 + 公共池分红。
+
+【重要提示】
+您的最终实验报酬将直接取决于您在本环节的收益总额。
+请仔细做出您的决策。""",
+
+    "pgg_hint_continue": "已了解规则，按 [空格键] 继续",
+    "pgg_hint_start": "已了解规则，按 [空格键] 开始投资决策",
+
+    # 【高必要性指导语 - 生存模式】
+    "necessity_high": """【本轮任务模式：生存挑战】
+
+!!! 警告：当前市场环境极其严峻 !!!
+
+补充规则：
+1. 本轮投资存在**硬性门槛**：三人投入公共池的总额必须达到【{threshold}个代币】。
+2. 【后果】：如果总额低于 {threshold} 个，公共池将直接**破产清零**，所有投入的资金将被系统没收，无人获得分红！
+3. 只有总额达标，才会触发翻倍分红。
+
+为了避免颗粒无收，请务必慎重考虑团队合作。
+
+按 [空格键] 确认并开始决策。""",
+
+    # 【低必要性指导语 - 常规模式】
+    "necessity_low": """【本轮任务模式：自由投资】
+
+当前市场环境宽松。
+
+补充规则：
+1. 本轮投资**没有最低门槛**。
+2. 无论公共池中的总金额是多少，系统都会正常进行翻倍并分红。
+3. 您可以完全根据个人意愿自由决定投入金额。
+
+按 [空格键] 确认并开始决策。""",
+}
@@ -0,0 +1,35 @@
+"""
+时间轴：把封面故事动画 (匹配玩家、分析进度) 描述为一串依次播放的片段，
+逐帧循环中按已用时间查询当前片段和片段内进度，不再用 sleep 推进动画，
+动画期间照常读取事件 (窗口保持响应，关闭窗口能及时退出)。
+"""
+import bisect
+
+
+def timeline(durations_ms):
+    """各片段时长 (毫秒) -> 各片段的结束时刻 (从动画开始累计)"""
+    ends = []
+    total = 0
+    for duration in durations_ms:
+        total += duration
+        ends.append(total)
+    return ends
+
+
+def locate(ends, t_ms):
+    """t_ms 时刻所在的片段序号和片段内进度 (0~1)；时间轴已播完时返回 (片段数, 1.0)"""
+    index = bisect.bisect_right(ends, t_ms)
+    if index >= len(ends):
+        return len(ends), 1.0
+    start = ends[index - 1] if index else 0
+    return index, (t_ms - start) / (ends[index] - start)
+
+
+def ease_in_out(x):
+    """缓入缓出 (smoothstep)"""
+    return x * x * (3 - 2 * x)
+
+
+def tween(start, end, x, ease=ease_in_out):
+    """按进度 x (0~1) 在 start 和 end 之间插值"""
+    return start + (end - start) * ease(x)
@@ -0,0 +1,155 @@
+"""
+高精度计时：统一使用单调时钟 time.perf_counter_ns (纳秒)。
+
+按键时间戳在事件出队时立即打上；刺激呈现时间取自使刺激可见的那次
+flip / display.update 之后。反应时 = 两者之差，精度优于 1 ms，
+且与该帧绘制耗时无关。
+
+所有画面提交都经过 flip_display / update_display，按场景记录每次提交的
+时间戳，会话结束时汇总帧间隔、抖动和掉帧数，写入 timing_quality_<ID>.csv。
+
+逐帧循环的场景在每帧末尾调用 pace_frame，按场景的目标帧率等待并记录实际帧率；
+垂直同步开启时，本帧提交过画面就由提交本身定速，不再额外等待。
+"""
+import csv
+import statistics
+import time
+
+import pygame
+
+now_ns = time.perf_counter_ns
+
+# 帧间隔超过期望值的多少倍视为掉帧
+DROP_TOLERANCE = 1.5
+
+_last_flip_ns = 0  # 最近一次画面提交完成的时间
+_scene_name = None  # 当前场景
+_scene_flips = {}  # 场景 -> [每次画面提交完成的时间 ns]
+_scene_periods = {}  # 场景 -> 期望帧间隔 (毫秒)，只对连续动画场景有意义
+_scene_rates = {}  # 场景 -> 逐帧循环的目标帧率 (Hz)
+_scene_ticks = {}  # 场景 -> [每帧结束的时间 ns]
+_vsync = False  # 画面提交是否与显示器刷新同步
+_last_tick_ns = 0
+_scene_listeners = []  # 场景切换时的回调
+
+
+def begin_scene(name, frame_period_ms=None, frame_rate=None):
+    """
+    开始记录一个场景的帧时间；frame_period_ms 为连续动画场景的期望帧间隔，
+    frame_rate 为逐帧循环场景的目标帧率 (pace_frame 据此等待)
+    """
+    global _scene_name
+    _scene_name = name
+    _scene_flips.setdefault(name, [])
+    _scene_ticks.setdefault(name, [])
+    if frame_period_ms:
+        _scene_periods[name] = frame_period_ms
+    if frame_rate:
+        _scene_rates[name] = frame_rate
+    for callback in _scene_listeners:
+        callback(name)
+
+
+def reset_timing():
+    """清空各场景的帧记录 (同一进程内连续运行多个会话时，每个会话开始前调用)"""
+    global _last_flip_ns, _scene_name, _last_tick_ns
+    _last_flip_ns = 0
+    _last_tick_ns = 0
+    _scene_name = None
+    _scene_flips.clear()
+    _scene_periods.clear()
+    _scene_rates.clear()
+    _scene_ticks.clear()
+
+
+def on_scene_change(callback):
+    """注册场景切换回调 callback(name) (如日志在场景边界 flush)"""
+    _scene_listeners.append(callback)
+
+
+def _record_flip():
+    global _last_flip_ns
+    _last_flip_ns = now_ns()
+    if _scene_name is not None:
+        _scene_flips[_scene_name].append(_last_flip_ns)
+    return _last_flip_ns
+
+
+def flip_display():
+    """pygame.display.flip() 并记录提交完成的时间"""
+    pygame.display.flip()
+    return _record_flip()
+
+
+def update_display(rects):
+    """pygame.display.update(rects) 并记录提交完成的时间"""
+    pygame.display.update(rects)
+    return _record_flip()
+
+
+def set_vsync(active):
+    """记录窗口是否以垂直同步方式打开"""
+    global _vsync
+    _vsync = active
+
+
+def pace_frame(clock):
+    """结束一帧：按当前场景的目标帧率等待 (垂直同步且本帧提交过画面时不再等待)，记录本帧结束时间"""
+    global _last_tick_ns
+    if _vsync and _last_flip_ns > _last_tick_ns:
+        clock.tick()
+    else:
+        clock.tick(_scene_rates.get(_scene_name, 0))
+    _last_tick_ns = now_ns()
+    if _scene_name is not None:
+        _scene_ticks[_scene_name].append(_last_tick_ns)
+
+
+def last_flip_ns():
+    """最近一次画面提交完成的时间 (用作场景的刺激呈现时间)"""
+    return _last_flip_ns
+
+
+def elapsed_ms(start_ns, end_ns):
+    """两个纳秒时间戳之差，单位毫秒 (保留到微秒)"""
+    return round((end_ns - start_ns) / 1e6, 3)
+
+
+def scene_timing_summary():
+    """按场景汇总帧数、帧间隔、抖动 (标准差)、掉帧数，以及逐帧循环的目标/实际帧率"""
+    rows = []
+    for name, flips in _scene_flips.items():
+        intervals = [(b - a) / 1e6 for a, b in zip(flips, flips[1:])]
+        period = _scene_periods.get(name)
+        ticks = _scene_ticks.get(name, [])
+        tick_span_ns = ticks[-1] - ticks[0] if len(ticks) > 1 else 0
+        row = {
+            "Scene": name,
+            "Frames": len(flips),
+            "First_Flip_ns": flips[0] if flips else "",
+            "Expected_Frame_ms": round(period, 3) if period else "",
+            "Mean_Interval_ms": round(statistics.fmean(intervals), 3) if intervals else "",
+            "Jitter_SD_ms": round(statistics.pstdev(intervals), 3) if intervals else "",
+            "Max_Interval_ms": round(max(intervals), 3) if intervals else "",
+            "Dropped_Frames": "",
+            "Target_Hz": _scene_rates.get(name, ""),
+            "Achieved_Hz": round((len(ticks) - 1) / (tick_span_ns / 1e9), 2) if tick_span_ns else "",
+            "VSync": int(_vsync),
+        }
+        if period and intervals:
+            # 一个过长的间隔可能吞掉了多帧
+            row["Dropped_Frames"] = sum(round(i / period) - 1 for i in intervals if i > period * DROP_TOLERANCE)
+        rows.append(row)
+    return rows
+
+
+def write_timing_summary(filename):
+    """把各场景的计时质量汇总写入 CSV"""
+    rows = scene_timing_summary()
+    fieldnames = ["Scene", "Frames", "First_Flip_ns", "Expected_Frame_ms", "Mean_Interval_ms",
+                  "Jitter_SD_ms", "Max_Interval_ms", "Dropped_Frames", "Target_Hz", "Achieved_Hz", "VSync"]
+    with open(filename, mode='w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+    return rows
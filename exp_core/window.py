@@ -0,0 +1,46 @@
+"""
+窗口隐藏/恢复：外部 Cyberball 运行期间不再 pygame.quit()，只把实验窗口藏起来，
+结束后原样恢复。字体缓存、预渲染的静态画面和日志都保持有效，反馈画面可立即显示。
+
+优先使用 SDL2 的窗口接口 (hide/show)；不可用时退回到最小化 + set_mode 恢复。
+"""
+import pygame
+
+try:
+    from pygame._sdl2.video import Window
+except ImportError:
+    Window = None
+
+
+def _sdl_window():
+    """当前 display 模块窗口的 SDL2 Window 对象 (不可用时为 None)"""
+    if Window is None or pygame.display.get_surface() is None:
+        return None
+    try:
+        return Window.from_display_module()
+    except Exception:
+        return None
+
+
+def hide_window():
+    """隐藏当前窗口 (不支持时最小化)"""
+    window = _sdl_window()
+    if window is not None:
+        window.hide()
+    else:
+        pygame.display.iconify()
+    pygame.event.pump()
+
+
+def restore_window(size, flags=0, vsync=0):
+    """重新显示窗口并置于前台，丢弃隐藏期间积压的事件，返回 display Surface"""
+    window = _sdl_window()
+    if window is not None:
+        window.show()
+        window.restore()
+        window.focus()
+    else:
+        # 最小化后重新 set_mode 即可恢复窗口，pygame 本身并未关闭
+        pygame.display.set_mode(size, flags, vsync=vsync)
+    pygame.event.clear()
+    return pygame.display.get_surface()